@@ -0,0 +1,236 @@
+#! /usr/bin/env python
+
+"""
+	A/B benchmark runner for option variants of this recipe. Every variant is installed with
+	`conan install` (built if it's missing from the local cache, reused otherwise), and
+	a benchmark from the test_package (`usd_benchmark.py`, or `startup_benchmark.py` with
+	`--benchmark=startup`) is run against each one in an environment made only from the
+	package's `conanbuild`/`conanrun` scripts (i.e. its buildenv_info/runenv_info), so variants can't
+	leak into each other through PYTHONPATH or the library path. The only addition is the recipe
+	folder on PYTHONPATH, for the stage generator that `usd_benchmark.py` imports from
+	`pgo_training.py`.
+
+	```
+		./abbench.py --variant=baseline: --variant=fast:safety_over_speed=False,allocator=tbbmalloc
+			[--variant=name:opt=value,...] [--runs=N] [--benchmark=usd|startup] [--size=small|medium|large] [--repeat=N]
+			[--profile=name] [--conan-arg=ARG ...] [--workdir=path] [--out=results.json] [--md=results.md]
+	```
+
+	Options without a package pattern apply to openusd; patterned ones (`opensubdiv/*:with_tbb=False`)
+	are passed to conan as-is. The first variant is the baseline the others are compared against.
+
+	The runs are interleaved (A B C A B C ...) so that drift in the machine's state affects all variants
+	equally. Every run is a separate process, and its median per metric is one observation. Deltas
+	are reported as the relative difference of the medians of those observations, with a 95% bootstrap
+	confidence interval; a delta whose interval doesn't contain zero is marked as significant.
+"""
+
+import sys, os, json, random, statistics, subprocess, shlex, yaml
+from pathlib import Path
+
+recipe_dir = Path(__file__).resolve().parent
+benchmark_scripts = {
+	'usd': recipe_dir/'test_package'/'usd_benchmark.py',
+	'startup': recipe_dir/'test_package'/'startup_benchmark.py',
+}
+
+# variables kept from the caller's environment; everything else comes from the package
+passthrough_env = ['HOME', 'PATH', 'TMPDIR', 'LANG', 'TERM']
+
+
+def parse_variant(spec):
+	"""
+		Parses `name:opt=value,...` into (name, [conan option arguments])
+	"""
+	name, _, opts = spec.partition(':')
+	args = []
+	for opt in filter(None, opts.split(',')):
+		key, value = opt.split('=', 1)
+		if ':' not in key:
+			key = f'openusd/*:{key}'
+		args += ['-o', f'{key}={value}']
+	return name, args
+
+
+def recipe_version():
+	with open(recipe_dir/'conandata.yml') as f:
+		return list(yaml.safe_load(f).keys())[-1]
+
+
+def install_variant(name, option_args, workdir, extra_args, version):
+	"""
+		Installs a variant (building it if needed) and returns the folder with its environment scripts
+	"""
+	folder = workdir/name
+	cmd = [
+		'conan', 'install', f'--requires=openusd/{version}', '--build=missing',
+		'-g', 'VirtualBuildEnv', '-g', 'VirtualRunEnv',
+		f'--output-folder={folder}',
+	] + option_args + extra_args
+	print(f'[{name}] {shlex.join(cmd)}', file=sys.stderr)
+	subprocess.run(cmd, check=True)
+	return folder
+
+
+def run_benchmark(name, env_folder, workdir, benchmark, size, repeat, index):
+	out = workdir/name/f'{benchmark}_run_{index}.json'
+	bench = [
+		'python3', str(benchmark_scripts[benchmark]), str(workdir/name/'stages'),
+		f'--size={size}', f'--out={out}', f'--tag=variant={name}',
+	]
+	if repeat:
+		bench.append(f'--repeat={repeat}')
+	# `usd_benchmark.py` generates its stages with `pgo_training.py` from the recipe folder
+	script = (
+		f'. "{env_folder}/conanbuild.sh" && . "{env_folder}/conanrun.sh" && '
+		f'export PYTHONPATH={shlex.quote(str(recipe_dir))}"${{PYTHONPATH:+:$PYTHONPATH}}" && '
+		+ shlex.join(bench)
+	)
+	env = {k: os.environ[k] for k in passthrough_env if k in os.environ}
+	subprocess.run(['bash', '-c', script], env=env, check=True, stdout=subprocess.DEVNULL)
+	with open(out) as f:
+		return json.load(f)
+
+
+def bootstrap_delta(base, other, iterations=2000, seed=0):
+	"""
+		Relative difference of the medians (other/base - 1) and its 95% bootstrap confidence interval
+	"""
+	rng = random.Random(seed)
+	estimate = statistics.median(other) / statistics.median(base) - 1
+	deltas = []
+	for _ in range(iterations):
+		b = [rng.choice(base) for _ in base]
+		o = [rng.choice(other) for _ in other]
+		deltas.append(statistics.median(o) / statistics.median(b) - 1)
+	deltas.sort()
+	return estimate, deltas[int(iterations * 0.025)], deltas[int(iterations * 0.975) - 1]
+
+
+def compare(observations, names):
+	"""
+		observations: {variant: {metric: [run medians]}}. Returns the comparison of every variant
+		against the first one.
+	"""
+	base = names[0]
+	report = {'baseline': base, 'metrics': {}}
+	for metric in sorted(observations[base]):
+		entry = {}
+		for name in names:
+			values = observations[name].get(metric)
+			if not values:
+				continue
+			entry[name] = {'median': statistics.median(values), 'observations': values}
+			if name != base:
+				delta, low, high = bootstrap_delta(observations[base][metric], values)
+				entry[name].update(delta=delta, ci_low=low, ci_high=high, significant=not (low <= 0 <= high))
+		report['metrics'][metric] = entry
+	return report
+
+
+def to_markdown(report, names):
+	base = report['baseline']
+	lines = [
+		'| metric | ' + ' | '.join(names) + ' |',
+		'|---' * (len(names) + 1) + '|',
+	]
+	for metric, entry in report['metrics'].items():
+		cells = []
+		for name in names:
+			r = entry.get(name)
+			if r is None:
+				cells.append('-')
+			elif name == base:
+				cells.append(f"{r['median'] * 1000:.2f}ms")
+			else:
+				mark = ' *' if r['significant'] else ''
+				cells.append(f"{r['delta'] * 100:+.1f}% [{r['ci_low'] * 100:+.1f}, {r['ci_high'] * 100:+.1f}]{mark}")
+		lines.append(f'| {metric} | ' + ' | '.join(cells) + ' |')
+	lines.append('')
+	lines.append(f'Deltas are relative to `{base}` with 95% bootstrap confidence intervals; `*` marks significant ones.')
+	return '\n'.join(lines) + '\n'
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} --variant=name:opt=value,... --variant=... [--runs=N] [--benchmark=usd|startup] [--size=small|medium|large] [--repeat=N] [--profile=name] [--conan-arg=ARG ...] [--workdir=path] [--out=results.json] [--md=results.md]\n")
+	print("The first variant is the baseline. Options without a package pattern apply to openusd.")
+
+
+if __name__ == '__main__':
+	variants = []
+	extra_args = []
+	runs = 5
+	benchmark = 'usd'
+	size = 'small'
+	repeat = None
+	workdir = Path('abbench')
+	out = None
+	md = None
+	for arg in sys.argv[1:]:
+		if arg.startswith('--variant='):
+			variants.append(parse_variant(arg.split('=', 1)[1]))
+		elif arg.startswith('--runs='):
+			runs = int(arg.split('=', 1)[1])
+		elif arg.startswith('--benchmark='):
+			benchmark = arg.split('=', 1)[1]
+			if benchmark not in benchmark_scripts:
+				print(f'Unknown benchmark: {benchmark}')
+				print_usage()
+				sys.exit(1)
+		elif arg.startswith('--size='):
+			size = arg.split('=', 1)[1]
+		elif arg.startswith('--repeat='):
+			repeat = int(arg.split('=', 1)[1])
+		elif arg.startswith('--profile='):
+			extra_args += ['-pr', arg.split('=', 1)[1]]
+		elif arg.startswith('--conan-arg='):
+			extra_args.append(arg.split('=', 1)[1])
+		elif arg.startswith('--workdir='):
+			workdir = Path(arg.split('=', 1)[1])
+		elif arg.startswith('--out='):
+			out = arg.split('=', 1)[1]
+		elif arg.startswith('--md='):
+			md = arg.split('=', 1)[1]
+		else:
+			print(f'Unknown argument: {arg}')
+			print_usage()
+			sys.exit(1)
+
+	names = [name for name, _ in variants]
+	if len(variants) < 2 or len(set(names)) != len(names):
+		print('At least two variants with distinct names are needed')
+		print_usage()
+		sys.exit(1)
+	if runs < 2:
+		print('At least two runs are needed for confidence intervals')
+		sys.exit(1)
+
+	workdir = workdir.resolve()
+	version = recipe_version()
+	subprocess.run(['conan', 'export', str(recipe_dir), f'--version={version}'], check=True)
+	env_folders = {name: install_variant(name, args, workdir, extra_args, version) for name, args in variants}
+
+	observations = {name: {} for name in names}
+	hosts = {}
+	for i in range(runs):
+		for name in names:
+			print(f'[{name}] run {i + 1}/{runs}', file=sys.stderr)
+			result = run_benchmark(name, env_folders[name], workdir, benchmark, size, repeat, i)
+			hosts[name] = result['host']
+			for metric, r in result['results'].items():
+				observations[name].setdefault(metric, []).append(r['median'])
+
+	report = compare(observations, names)
+	report['variants'] = {name: {'options': args, 'host': hosts[name]} for name, args in variants}
+	report['runs'] = runs
+	report['size'] = size
+	report['benchmark'] = benchmark
+
+	text = to_markdown(report, names)
+	print(text)
+	if md:
+		with open(md, 'w') as f:
+			f.write(text)
+	if out:
+		with open(out, 'w') as f:
+			json.dump(report, f, indent=2)
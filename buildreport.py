@@ -0,0 +1,249 @@
+#! /usr/bin/env python
+
+"""
+	Helper to summarize where the time of an openusd build went. It parses the `.ninja_log` of a
+	build folder (and the `-ftime-trace` json files clang writes next to the objects, if any) and
+	produces a report with the slowest translation units, the total time spent in each component
+	(using the same names as `_auto_info` in conanfile.py) and an estimate of the critical path.
+
+	It's run automatically at the end of the recipe's `build()` when building with Ninja, but can
+	also be used on its own:
+
+	```
+		./buildreport.py /path/to/openusd/build [--json report.json] [--md report.md] [--top N]
+	```
+"""
+
+import sys, json, os, re
+from pathlib import Path
+
+# matches the object/target folder cmake creates for every target, e.g. `CMakeFiles/sdf.dir/`
+target_dir_re = re.compile(r'CMakeFiles/([^/]+)\.dir/')
+# matches the libraries themselves, e.g. `libusd_sdf.so` or `usd_sdf.dll`
+library_re = re.compile(r'(?:^|/)(?:lib)?usd_([A-Za-z0-9]+)\.[^/]*$')
+# the mtimes in the ninja log are in ns, or in 100ns units on Windows
+mtime_ticks_per_ms = 10_000 if os.name == 'nt' else 1_000_000
+# file timestamps are coarser than the clock ninja times the edges with
+mtime_slack_ms = 10
+
+
+def component_of(output):
+	"""
+		Returns the `_auto_info` component name a ninja output belongs to, or 'other'. Python wrap
+		modules (`_sdf`) are attributed to the component they wrap.
+	"""
+	if m := target_dir_re.search(output):
+		return m.group(1).lstrip('_')
+	if m := library_re.search(output):
+		return 'usd_ms' if m.group(1) == 'ms' else m.group(1)
+	return 'other'
+
+
+def read_ninja_log(filename):
+	"""
+		Parses a `.ninja_log` (v5 and later) and returns the build edges of the most recent ninja
+		run as dicts with `start`, `end` (in ms since the start of the run), `duration` and
+		`outputs`. Ninja appends the entries of every run, restarting the clock, but recompacts the
+		log into the latest entry of every output once it grows, which mixes the runs up, so neither
+		the order nor the start and end times tell them apart. The recorded mtimes of the outputs do: an output
+		belongs to the most recent run if it was written after that run started. Edges that didn't
+		(re)write their outputs, e.g. restat rules, are attributed to an earlier run.
+	"""
+	latest = {}
+	with open(filename) as f:
+		header = f.readline()
+		if not header.startswith('# ninja log v'):
+			raise ValueError(f'{filename} is not a ninja log')
+		for line in f:
+			parts = line.rstrip('\n').split('\t')
+			if len(parts) < 5:
+				continue
+			start, end, mtime, output, cmdhash = parts[:5]
+			# a later entry for the same output supersedes the earlier ones
+			latest[output] = (int(start), int(end), int(mtime), cmdhash)
+
+	# an output is written before its edge ends, so `mtime - end` is never later than the start of
+	# the run that built it, and the latest of them is the closest bound of the most recent run
+	run_start = max((mtime - end * mtime_ticks_per_ms for _, end, mtime, _ in latest.values() if mtime), default=None)
+	if run_start is not None:
+		run_start -= mtime_slack_ms * mtime_ticks_per_ms
+		latest = {output: entry for output, entry in latest.items() if entry[2] >= run_start}
+
+	# outputs that share a command hash and timing were produced by the same edge
+	edges = {}
+	for output, (start, end, _mtime, cmdhash) in latest.items():
+		key = (start, end, cmdhash)
+		if key not in edges:
+			edges[key] = {'start': start, 'end': end, 'duration': end - start, 'outputs': []}
+		edges[key]['outputs'].append(output)
+	return sorted(edges.values(), key=lambda e: e['start'])
+
+
+def critical_path(edges):
+	"""
+		Estimates the critical path from the build timeline: starting from the edge that finished
+		last, repeatedly step to the edge that finished most recently before the current one
+		started (which is what it was most likely waiting for). The log doesn't record dependencies,
+		so this is an approximation that is exact for a fully serialized chain.
+	"""
+	if not edges:
+		return []
+	by_end = sorted(edges, key=lambda e: e['end'])
+	path = [by_end[-1]]
+	while True:
+		cur = path[-1]
+		prev = None
+		for e in by_end:
+			if e['end'] > cur['start']:
+				break
+			prev = e
+		if prev is None:
+			break
+		path.append(prev)
+	return list(reversed(path))
+
+
+def read_time_traces(build_dir, top=20):
+	"""
+		Collects the clang `-ftime-trace` output in `build_dir`. Returns None if there isn't any,
+		otherwise the total time of each compiler phase and the headers that took the longest to
+		parse, summed over every translation unit (all in ms).
+	"""
+	phases = {}
+	headers = {}
+	found = False
+	for root, _dirs, files in os.walk(build_dir):
+		if 'CMakeFiles' not in root:
+			continue
+		for name in files:
+			if not name.endswith('.json'):
+				continue
+			try:
+				with open(Path(root)/name) as f:
+					trace = json.load(f)
+			except (OSError, ValueError):
+				continue
+			if not isinstance(trace, dict) or 'traceEvents' not in trace:
+				continue
+			found = True
+			for ev in trace['traceEvents']:
+				if ev.get('ph') != 'X':
+					continue
+				ev_name = ev.get('name', '')
+				dur = ev.get('dur', 0) / 1000.0
+				if ev_name.startswith('Total '):
+					phases[ev_name[6:]] = phases.get(ev_name[6:], 0.0) + dur
+				elif ev_name == 'Source':
+					detail = ev.get('args', {}).get('detail', '')
+					headers[detail] = headers.get(detail, 0.0) + dur
+	if not found:
+		return None
+	top_headers = sorted(headers.items(), key=lambda h: h[1], reverse=True)[:top]
+	return {
+		'phases': {k: round(v) for k, v in sorted(phases.items(), key=lambda p: p[1], reverse=True)},
+		'headers': [{'header': h, 'time': round(t)} for h, t in top_headers],
+	}
+
+
+def make_report(build_dir, top=20):
+	build_dir = Path(build_dir)
+	edges = read_ninja_log(build_dir/'.ninja_log')
+
+	components = {}
+	for e in edges:
+		comp = component_of(e['outputs'][0])
+		info = components.setdefault(comp, {'time': 0, 'edges': 0})
+		info['time'] += e['duration']
+		info['edges'] += 1
+
+	def edge_info(e):
+		return {'output': e['outputs'][0], 'component': component_of(e['outputs'][0]), 'duration': e['duration']}
+
+	compiles = [e for e in edges if any(o.endswith(('.o', '.obj')) for o in e['outputs'])]
+	# the headers precompiled by the `precompiled_headers` option (cmake_pch.hxx.gch/.pch)
+	pchs = [e for e in edges if any(o.endswith(('.gch', '.pch')) for o in e['outputs'])]
+	slowest = sorted(compiles, key=lambda e: e['duration'], reverse=True)[:top]
+	path = critical_path(edges)
+
+	wall = max((e['end'] for e in edges), default=0) - min((e['start'] for e in edges), default=0)
+	return {
+		'wall_time': wall,
+		'cpu_time': sum(e['duration'] for e in edges),
+		'edges': len(edges),
+		'compile_time': sum(e['duration'] for e in compiles),
+		'precompiled_headers': {
+			'count': len(pchs),
+			'time': sum(e['duration'] for e in pchs),
+		},
+		'slowest': [edge_info(e) for e in slowest],
+		'components': dict(sorted(components.items(), key=lambda c: c[1]['time'], reverse=True)),
+		'critical_path': {
+			'time': sum(e['duration'] for e in path),
+			'edges': [edge_info(e) for e in path],
+		},
+		'time_trace': read_time_traces(build_dir, top),
+	}
+
+
+def fmt_ms(ms):
+	return f'{ms / 1000.0:.1f}s'
+
+
+def to_markdown(report):
+	out = ['# OpenUSD build report', '']
+	out.append(f"- wall time: {fmt_ms(report['wall_time'])}")
+	out.append(f"- cpu time: {fmt_ms(report['cpu_time'])}")
+	out.append(f"- build edges: {report['edges']}")
+	out.append(f"- compile time: {fmt_ms(report['compile_time'])}")
+	if report['precompiled_headers']['count']:
+		pch = report['precompiled_headers']
+		out.append(f"- precompiled headers: {pch['count']} built in {fmt_ms(pch['time'])}")
+	out.append(f"- critical path: {fmt_ms(report['critical_path']['time'])} ({len(report['critical_path']['edges'])} edges)")
+
+	out += ['', '## Components', '', '| component | time | edges |', '| --- | --- | --- |']
+	for name, info in report['components'].items():
+		out.append(f"| {name} | {fmt_ms(info['time'])} | {info['edges']} |")
+
+	out += ['', '## Slowest translation units', '', '| output | component | time |', '| --- | --- | --- |']
+	for e in report['slowest']:
+		out.append(f"| `{e['output']}` | {e['component']} | {fmt_ms(e['duration'])} |")
+
+	out += ['', '## Critical path', '', '| output | component | time |', '| --- | --- | --- |']
+	for e in report['critical_path']['edges']:
+		out.append(f"| `{e['output']}` | {e['component']} | {fmt_ms(e['duration'])} |")
+
+	if trace := report.get('time_trace'):
+		out += ['', '## Compiler phases (-ftime-trace)', '', '| phase | time |', '| --- | --- |']
+		for phase, t in trace['phases'].items():
+			out.append(f'| {phase} | {fmt_ms(t)} |')
+		out += ['', '## Most expensive headers', '', '| header | parse time |', '| --- | --- |']
+		for h in trace['headers']:
+			out.append(f"| `{h['header']}` | {fmt_ms(h['time'])} |")
+	return '\n'.join(out) + '\n'
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} </path/to/build/folder> [--json report.json] [--md report.md] [--top N]\n")
+	print("The build folder must have been built with a Ninja generator (it needs the .ninja_log file).")
+
+
+if __name__ == '__main__':
+	if not len(sys.argv) >= 2:
+		print_usage()
+		sys.exit(1)
+
+	args = sys.argv[2:]
+	def arg(name, default=None):
+		if name in args and args.index(name) + 1 < len(args):
+			return args[args.index(name) + 1]
+		return default
+
+	report = make_report(sys.argv[1], int(arg('--top', 20)))
+	if path := arg('--json'):
+		with open(path, 'w') as f:
+			json.dump(report, f, indent=2)
+	if path := arg('--md'):
+		with open(path, 'w') as f:
+			f.write(to_markdown(report))
+	if not arg('--json') and not arg('--md'):
+		print(to_markdown(report))
@@ -1,8 +1,24 @@
+import io
 import os
+import re
+import json
+import hashlib
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
 from conan import ConanFile
+from conan.errors import ConanException, ConanInvalidConfiguration
+from conan.tools.build import can_run
 from conan.tools.cmake import CMakeToolchain, CMakeDeps, CMake, cmake_layout
-from conan.tools.files import copy, get
+from conan.tools.env import Environment
+from conan.tools.files import copy, get, replace_in_file, rmdir, save
+
+import buildreport
+import pluginindex
+import unitycheck
 
 required_conan_version = ">=2.4.1"
 
@@ -10,6 +26,7 @@ class OpenUSD(ConanFile):
     name = "openusd"
     settings = 'os', 'compiler', 'arch', 'build_type'
     implements = ["auto_shared_fpic"]
+    exports = ['buildreport.py', 'pgo_training.py', 'pluginindex.py', 'unitycheck.py']
     options = {
         'shared': [True, False],
         'fPIC': [True, False],
@@ -17,15 +34,34 @@ class OpenUSD(ConanFile):
         'imaging': [True, False], # build imaging library (hydra stuff)
         'usdimaging': [True, False], # build usdimaging library
         'tools': [True, False], # build the usd command-line tools
-        'ptex': [True, False], # enable ptex support for imaging
-        'materialx': [True, False], # enable MaterialX support
-        'opencolorio': [True, False], # enable OpenColorIO support for imaging
-        'openimageio': [True, False], # enable OpenImageIO support for imaging
+        'python': [True, False], # build the python bindings (and link boost::python)
+        # the optional features below follow `dependency_profile` when left to None
+        'ptex': [None, True, False], # enable ptex support for imaging
+        'materialx': [None, True, False], # enable MaterialX support
+        'opencolorio': [None, True, False], # enable OpenColorIO support for imaging
+        'openimageio': [None, True, False], # enable OpenImageIO support for imaging
         'embree': [True, False], # enable embree-based rendering plugin
-        'draco': [True, False], # enable usdDraco plugin
-        'alembic': [True, False], # enable usdAbc plugin
-        'openvdb': [True, False],
+        'draco': [None, True, False], # enable usdDraco plugin
+        'alembic': [None, True, False], # enable usdAbc plugin
+        'openvdb': [None, True, False],
+        'dependency_profile': ['lean', 'full'], # lean: only the dependencies (and backends) the built components need
         'safety_over_speed': [True, False], # trade performance for safety with malformed input files
+        'components': [None, 'ANY'], # comma-separated list of components to build (with their dependencies)
+        'monolithic': [True, False], # build a single libusd_ms library instead of one per component
+        'lto': ['off', 'thin', 'full'], # link-time optimization of the OpenUSD libraries
+        'pgo': [True, False], # profile-guided optimization, trained with `pgo_training.py`
+        'allocator': ['system', 'tbbmalloc', 'jemalloc'], # malloc implementation linked into arch
+        'hidden_visibility': [True, False], # only export the symbols marked by OpenUSD's export macros
+        'fast_startup': [True, False], # link the OpenUSD libraries/tools with loader-friendly settings
+        'split_dwarf': [True, False], # keep the debug info in .dwo files instead of the objects (-gsplit-dwarf)
+        'separate_debug_info': [True, False], # strip the packaged binaries and store their debug info outside the package
+        'debug_info_package': [True, False], # package only the separate debug info, from the same build
+        'strip': [True, False], # strip the symbol tables of the packaged binaries (--strip-unneeded)
+        'package_layer': ['core', 'imaging', 'full'], # subset of the (shared) build that is packaged
+        'reproducible': [True, False], # byte-identical packages regardless of the build/cache folders
+        'unity_build': [True, False], # compile the sources in batches (CMAKE_UNITY_BUILD)
+        'unity_build_batch_size': ['ANY'], # number of sources per unity batch
+        'precompiled_headers': [True, False], # precompile each library's pch.h (target_precompile_headers)
     }
     default_options = {
         'shared': True,
@@ -34,45 +70,67 @@ class OpenUSD(ConanFile):
         'imaging': True,
         'usdimaging': True,
         'tools': True,
-        'opencolorio': True,
-        'ptex': True,
-        'openimageio': True,
-        'draco': True,
-        'alembic': True,
-        'openvdb': True,
+        'python': True,
+        'opencolorio': None,
+        'ptex': None,
+        'openimageio': None,
+        'draco': None,
+        'alembic': None,
+        'openvdb': None,
+        'dependency_profile': 'full',
 
         'safety_over_speed': True,
-
-        'materialx': True,
+        'components': None,
+        'monolithic': False,
+        'lto': 'off',
+        'pgo': False,
+        'hidden_visibility': False,
+        'fast_startup': False,
+        'split_dwarf': False,
+        'separate_debug_info': False,
+        'debug_info_package': False,
+        'strip': False,
+        'package_layer': 'full',
+        'reproducible': False,
+        'allocator': 'system',
+        'unity_build': False,
+        'unity_build_batch_size': 16,
+        'precompiled_headers': False,
+
+        'materialx': None,
         'materialx/*:render': True,
         
-        'onetbb/*:tbbmalloc': False,
-        'onetbb/*:tbbproxy': False,
-
         'embree': False,
         'embree/*:with_tbb': True,
 
         # usd *requires* shared link with boost::python (unless doing monolithic?)
         # see: https://github.com/PixarAnimationStudios/OpenUSD/issues/1087#issuecomment-636100768
+        # (boost/*:without_python follows the python option, see `configure()`)
         "boost/*:shared": True,
-        "boost/*:without_python": False,
 
+        # the opensubdiv backends follow `dependency_profile`, see `configure()`
         "opensubdiv/*:with_tbb": True,
-        "opensubdiv/*:with_opengl": True,
-        "opensubdiv/*:with_omp": True,
-        "opensubdiv/*:with_cuda": True,
-        "opensubdiv/*:with_clew": True,
-        "opensubdiv/*:with_opencl": True,
-        "opensubdiv/*:with_dx": True,
-        "opensubdiv/*:with_metal": True,
     }
 
+    # optional features turned on by the full `dependency_profile`
+    _profile_features = ['ptex', 'materialx', 'opencolorio', 'openimageio', 'draco', 'alembic', 'openvdb']
+
+    # opensubdiv backends that OpenUSD never links (it only uses osdcpu, and osdgpu through OpenGL)
+    _unused_osd_backends = ['omp', 'cuda', 'clew', 'opencl', 'dx', 'metal']
+
+    # boost libraries that neither OpenUSD nor its boost-using dependencies (openvdb, openimageio) link
+    _unused_boost_libs = [
+        'cobalt', 'context', 'contract', 'coroutine', 'fiber', 'graph', 'graph_parallel', 'iostreams',
+        'json', 'locale', 'log', 'math', 'mpi', 'nowide', 'program_options', 'random', 'regex',
+        'serialization', 'stacktrace', 'test', 'timer', 'type_erasure', 'url', 'wave',
+    ]
+
 
     def layout(self):
         cmake_layout(self)
 
 
-    def do_requires(self, pkg):
+    def do_requires(self, pkg, visible=True):
         # this calls `self.requires(...)` using relevant configuration specified in conandata.yml
         reqs = self.conan_data[self.version]['requirements']
         assert pkg in reqs
@@ -80,58 +138,69 @@ class OpenUSD(ConanFile):
         ver = info['version']
         orig = info['orig']
 
-        if ver != info['orig']:
+        # `orig` is null for the dependencies that upstream doesn't have, e.g. jemalloc
+        if orig is not None and ver != orig:
             self.output.warning(f'OpenUSD/{self.version} upstream expects "{pkg}" version {orig}, but we\'re using version {ver} instead')
 
         self.requires(
             '%s/%s' % (pkg, ver),
             override = info.get('override', False),
             force = info.get('force', False),
-            transitive_headers = info.get('transitive_headers', True),
+            # dependencies only used by the libraries that `package_layer` leaves out are needed to
+            # build, but not by consumers, which can then skip their binaries
+            transitive_headers = info.get('transitive_headers', True) and visible,
+            visible = visible,
+            run = None if visible else False,
         )
 
 
-    def requirements(self):
-        self.do_requires('onetbb')
-
-        self.do_requires('opensubdiv')
-        self.do_requires('boost')
+    def configure(self):
+        # defining configure() replaces the one from auto_shared_fpic
+        if self.options.shared:
+            self.options.rm_safe('fPIC')
 
-        needs_imath = False
+        # tbbmalloc is only useful through its proxy library, which replaces malloc/free process-wide
+        use_tbbmalloc = self.options.allocator == 'tbbmalloc'
+        self.options['onetbb/*'].tbbmalloc = use_tbbmalloc
+        self.options['onetbb/*'].tbbproxy = use_tbbmalloc
 
-        if self.options.ptex:
-            self.do_requires('ptex')
-
-        if self.options.draco:
-            self.do_requires('draco')
-        
-        if self.options.alembic:
-            self.do_requires('alembic')
-            needs_imath = True
+        # without the python bindings nothing links boost::python, so don't build it (or libpython)
+        self.options['boost/*'].without_python = not self.options.python
 
-        if self.options.openvdb:
-            self.do_requires('openvdb')
-            needs_imath = True
+        full = self.options.dependency_profile == 'full'
+        for option in self._profile_features:
+            if self.options.get_safe(option).value is None:
+                setattr(self.options, option, full)
 
-        if self.options.embree:
-            self.do_requires('embree3')
+        # OpenUSD only links osdcpu, and osdgpu for hdSt's OpenGL backend
+        for backend in self._unused_osd_backends:
+            setattr(self.options['opensubdiv/*'], f'with_{backend}', full)
+        self.options['opensubdiv/*'].with_opengl = full or self._component_enabled('hdSt')
 
-        if self.options.opencolorio:
-            self.do_requires('opencolorio')
+        # only boost::python is linked, unless openvdb or openimageio need more of boost
+        if not full and not self._uses('openvdb') and not self._uses('openimageio'):
+            for lib in self._unused_boost_libs:
+                setattr(self.options['boost/*'], f'without_{lib}', True)
 
-        if self.options.materialx:
-            self.do_requires('materialx')
 
-        if self.settings.os == 'Linux' and self.options.imaging:
-            # self.requires('xorg/system')
-            self.requires('opengl/system')
-        
-        if self.options.openimageio:
-            self.do_requires('openimageio')
-            needs_imath = True
+    def requirements(self):
+        # The requirements are derived from the components that are built (see `_package_components()`).
+        # The ones that no packaged component refers to (e.g. the imaging dependencies of the core
+        # `package_layer`) are still needed for the build, but are hidden from consumers, which
+        # otherwise expect every visible requirement to be used by a component
+        needed = self._required_packages('full')
+        # the debug info package has no libraries for consumers to link
+        visible = set() if self.options.debug_info_package else self._required_packages()
 
-        if needs_imath:
-            self.do_requires('imath')
+        reqs = self.conan_data[self.version]['requirements']
+        unknown = needed.difference(reqs, self._system_requirements)
+        if unknown:
+            raise ConanException(f'The components require packages missing from conandata.yml: {", ".join(sorted(unknown))}')
+        for pkg in sorted(needed):
+            if pkg in self._system_requirements:
+                self.requires(self._system_requirements[pkg], visible=pkg in visible)
+            else:
+                self.do_requires(pkg, visible=pkg in visible)
 
         # MISSING
         # self.requires('osl/1.10.9')
@@ -141,6 +210,169 @@ class OpenUSD(ConanFile):
             self.requires(pkg, override = True)
 
 
+    # requirements that aren't listed in conandata.yml
+    _system_requirements = {
+        'opengl': 'opengl/system',
+    }
+
+    # optional dependencies: the option that enables each one, and the component that uses it
+    _optional_deps = {
+        'ptex': ('ptex', 'hdSt'),
+        'draco': ('draco', 'usdGeom'),
+        'alembic': ('alembic', 'usdGeom'),
+        'openvdb': ('openvdb', 'hio'),
+        'embree3': ('embree', 'hdx'),
+        'opencolorio': ('opencolorio', 'hdx'),
+        'materialx': ('materialx', 'usdMtlx'),
+        'openimageio': ('openimageio', 'hio'),
+    }
+
+    def _uses(self, pkg):
+        option, component = self._optional_deps[pkg]
+        return bool(self.options.get_safe(option)) and self._component_enabled(component)
+
+
+    # the libraries that are built as part of pxr/imaging and pxr/usdImaging
+    _imaging_components = [
+        'garch', 'hf', 'hio', 'cameraUtil', 'pxOsd', 'geomUtil', 'glf', 'hgi', 'hgiGL', 'hgiInterop',
+        'hd', 'hdar', 'hdGp', 'hdsi', 'hdMtlx', 'hdSt', 'hdx',
+    ]
+    _usdimaging_components = [
+        'usdImaging', 'usdImagingGL', 'usdProcImaging', 'usdRiPxrImaging', 'usdSkelImaging',
+        'usdVolImaging', 'usdAppUtils',
+    ]
+
+    # Layers of the package, each including the previous ones. All of them share a single build (see
+    # `build_id()`), and only differ in the files they package:
+    #   core: the usd libraries (arch through usdUtils/usdPhysics) and their plugins
+    #   imaging: the imaging and usdImaging libraries (garch through usdAppUtils) and their plugins
+    #   full: also the command-line tools, the python bindings and the cmake config files
+    _package_layers = ['core', 'imaging', 'full']
+
+    def _layer_includes(self, layer, packaged=None):
+        packaged = packaged or str(self.options.package_layer)
+        return self._package_layers.index(layer) <= self._package_layers.index(packaged)
+
+
+    # libraries only used by the tools (usdview)
+    _tools_components = ['usdviewq']
+
+    def _component_layer(self, name):
+        # layer of an OpenUSD library, or of a folder named after one
+        if name in self._imaging_components or name in self._usdimaging_components:
+            return 'imaging'
+        if name in self._tools_components:
+            return 'full'
+        return 'core'
+
+
+    def _plugin_layer(self, name):
+        return 'imaging' if name.startswith(('hd', 'hio', 'hgi', 'glf')) else 'core'
+
+
+    # OpenUSD libraries, e.g. `libusd_sdf.so` or `usd_sdf.dll`
+    _library_file_re = re.compile(r'^(?:lib)?usd_([A-Za-z0-9]+)\.(?:so|dylib|dll|lib|a)(?:\.[0-9.]+)?$')
+
+    def _file_layer(self, rel):
+        # layer of a file of the install, given its path relative to the install folder
+        parts = rel.parts
+        if m := self._library_file_re.match(parts[-1]):
+            return self._component_layer(m.group(1))
+        if parts[0] == 'bin' or parts[:2] == ('lib', 'python') or parts[-1].endswith('.cmake'):
+            return 'full'
+        if parts[:2] == ('include', 'pxr') and len(parts) > 4:
+            # include/pxr/<group>/<library>/...
+            if parts[3] in self._tools_components:
+                return 'full'
+            return 'imaging' if parts[2] in ['imaging', 'usdImaging'] else 'core'
+        if parts[:2] == ('lib', 'usd') and len(parts) > 3:
+            layer = self._component_layer(parts[2])
+            return self._plugin_layer(parts[2]) if layer == 'core' else layer
+        if parts[:2] == ('plugin', 'usd') and len(parts) > 2:
+            return self._plugin_layer(parts[2].split('.')[0])
+        return 'core'
+
+
+    def _set_external_libs(self):
+        # referenced by `_auto_info` for requirements that depend on the configuration. boost is only
+        # required through boost::python, so python=False builds don't require it directly
+        self.boost_python_libs = ['boost::python'] if self.options.python else []
+        self.tbb_libs = ['onetbb::onetbb']
+
+
+    def _component_infos(self):
+        # runs `_auto_info` against plain objects, so the component layout can be inspected outside
+        # of `package_info()`
+        self._set_external_libs()
+        components = defaultdict(lambda: SimpleNamespace(requires=[], libs=[]))
+        self._auto_info(components)
+        return components
+
+
+    def _wanted_components(self):
+        # Returns the set of components to build, which is the transitive closure of the ones listed
+        # in the `components` option, or None to build everything
+        if not self.options.components:
+            return None
+        graph = {name: [r for r in info.requires if '::' not in r] for name, info in self._component_infos().items()}
+        wanted = [c.strip() for c in str(self.options.components).replace(' ', ',').split(',') if c.strip()]
+        unknown = [c for c in wanted if c not in graph]
+        if unknown:
+            raise ConanInvalidConfiguration(f'Unknown components in the "components" option: {unknown}. Valid components are: {list(graph)}')
+        closure = set()
+        while wanted:
+            name = wanted.pop()
+            if name not in closure:
+                closure.add(name)
+                wanted += graph[name]
+        return closure
+
+
+    def _component_enabled(self, name):
+        # the imaging/usdimaging options turn off whole groups of libraries
+        if name in self._imaging_components + self._usdimaging_components and not self.options.imaging:
+            return False
+        if name in self._usdimaging_components and not self.options.usdimaging:
+            return False
+        wanted = self._wanted_components()
+        return wanted is None or name in wanted
+
+
+    def validate(self):
+        self._wanted_components()
+
+        if self.options.pgo:
+            if str(self.settings.compiler) not in ['gcc', 'clang', 'apple-clang']:
+                raise ConanInvalidConfiguration('pgo is only supported with gcc and clang')
+            if not self.options.python:
+                raise ConanInvalidConfiguration('pgo needs python=True, the training workload uses the python bindings')
+            if not can_run(self):
+                raise ConanInvalidConfiguration('pgo needs to run the instrumented build, so it can\'t be used when cross-building')
+        for option in ['split_dwarf', 'separate_debug_info']:
+            if self.options.get_safe(option) and (self.settings.os in ['Windows', 'Macos'] or str(self.settings.compiler) not in ['gcc', 'clang']):
+                raise ConanInvalidConfiguration(f'{option} is only supported for ELF targets built with gcc or clang')
+        if self.options.package_layer != 'full' and self.options.monolithic:
+            raise ConanInvalidConfiguration('package_layer needs monolithic=False, a monolithic build has a single library')
+        if self.options.debug_info_package and not (self.options.separate_debug_info and self._has_debug_info()):
+            raise ConanInvalidConfiguration('debug_info_package needs separate_debug_info=True and a build_type with debug info')
+        if not str(self.options.unity_build_batch_size).isdigit() or int(self.options.unity_build_batch_size) < 1:
+            raise ConanInvalidConfiguration(f'unity_build_batch_size must be a positive integer, got "{self.options.unity_build_batch_size}"')
+
+
+    def build_id(self):
+        # every layer, and the debug info package, is packaged from the same build
+        self.info_build.options.package_layer = 'full'
+        self.info_build.options.debug_info_package = False
+
+
+    def package_id(self):
+        # unity builds and precompiled headers only change how the sources are compiled, not the
+        # resulting libraries
+        del self.info.options.unity_build
+        del self.info.options.unity_build_batch_size
+        del self.info.options.precompiled_headers
+
+
     def source(self):
         get(self, **self.conan_data[self.version]["sources"], strip_root=True, destination=self.source_folder)
 
@@ -167,55 +399,644 @@ class OpenUSD(ConanFile):
             # 'FindPySide.cmake',
             'FindRenderman.cmake',
         ]
+        # let the recipe skip libraries (and the plugins that depend on them) that aren't needed
+        # for the components requested with the `components` option, and precompile their headers
+        pxr_library_hook = (
+            'function(pxr_library NAME)\n'
+            '    if(COMMAND _conan_openusd_skip_library)\n'
+            '        _conan_openusd_skip_library(${NAME} _conan_skip ${ARGN})\n'
+            '        if(_conan_skip)\n'
+            '            return()\n'
+            '        endif()\n'
+            '    endif()\n'
+            '    if(COMMAND _conan_openusd_library_pch)\n'
+            '        _conan_openusd_library_pch(${NAME} ${ARGN})\n'
+            '    endif()\n'
+        )
+
+        # `_configure_cmake()` runs for build() and again for package(), and `conan build` can be
+        # repeated on the same sources, so the patches are applied once and recorded in a marker
+        patch_id = hashlib.sha256(json.dumps([files_to_delete, pxr_library_hook]).encode()).hexdigest()
+        marker = Path(self.source_folder)/'.conan_openusd_patched'
+        if marker.is_file() and marker.read_text() == patch_id:
+            return
+
         for file in files_to_delete:
-            os.remove(Path(self.source_folder)/"cmake"/"modules"/file)
+            (Path(self.source_folder)/"cmake"/"modules"/file).unlink(missing_ok=True)
+
+        public_cmake = Path(self.source_folder)/"cmake"/"macros"/"Public.cmake"
+        if pxr_library_hook not in public_cmake.read_text():
+            if marker.is_file():
+                # patched by a different version of the recipe, the old hook would stay in place
+                raise ConanException(f'{self.source_folder} was patched by a different recipe revision, remove it to fetch clean sources')
+            replace_in_file(self, public_cmake, 'function(pxr_library NAME)\n', pxr_library_hook)
+        save(self, marker, patch_id)
+
+
+    # Targets whose translation units need a lot more memory to compile than the rest (mostly due to
+    # heavy template use). The python wrap modules are all named with a leading underscore.
+    _heavy_targets = ['hdSt', 'usdImaging', 'usdImagingGL', 'usdMtlx', 'hdMtlx']
+    _heavy_target_prefixes = ['_']
+
+    # rough peak RSS (in MiB) of a single compiler process for each kind of target
+    _light_job_mem = 1024
+    _heavy_job_mem = 3072
+
+    def _available_memory_mb(self):
+        try:
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) // 1024
+        except (OSError, ValueError):
+            pass
+        try:
+            return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES') // (1024 * 1024)
+        except (ValueError, OSError, AttributeError):
+            return None
+
+
+    def _available_cpus(self):
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+
+    def _build_jobs(self):
+        # Returns (jobs, heavy_jobs). `tools.build:jobs` and `user.openusd:heavy_jobs` can be set in
+        # a profile or on the command line to override the values derived from the host
+        jobs = self.conf.get('tools.build:jobs', check_type=int)
+        heavy_jobs = self.conf.get('user.openusd:heavy_jobs', check_type=int)
+
+        if not jobs:
+            jobs = self._available_cpus()
+            mem = self._available_memory_mb()
+            if mem is not None:
+                jobs = max(1, min(jobs, mem // self._light_job_mem))
+
+        if not heavy_jobs:
+            heavy_jobs = jobs
+            mem = self._available_memory_mb()
+            if mem is not None:
+                heavy_jobs = max(1, min(jobs, mem // self._heavy_job_mem))
+
+        return jobs, min(jobs, heavy_jobs)
+
+
+    def _cmake_hooks_file(self):
+        return Path(self.generators_folder)/'conan_openusd_hooks.cmake'
+
+
+    def _cmake_target_hooks(self):
+        # Returns (functions, body, finish). `body` is cmake code run once for every compiled target,
+        # with the target name in `${target}`, `functions` are helper definitions it may use, and
+        # `finish` runs once after every target has been handled
+        functions = [
+            'function(_conan_openusd_is_heavy target out)',
+            f'    set(heavy_targets {";".join(self._heavy_targets)})',
+            f'    set(heavy_prefixes {";".join(self._heavy_target_prefixes)})',
+            '    set(${out} FALSE PARENT_SCOPE)',
+            '    if(target IN_LIST heavy_targets)',
+            '        set(${out} TRUE PARENT_SCOPE)',
+            '    endif()',
+            '    foreach(prefix ${heavy_prefixes})',
+            '        string(FIND "${target}" "${prefix}" pos)',
+            '        if(pos EQUAL 0)',
+            '            set(${out} TRUE PARENT_SCOPE)',
+            '        endif()',
+            '    endforeach()',
+            'endfunction()',
+        ]
+        body = [
+            '_conan_openusd_is_heavy(${target} is_heavy)',
+            'if(is_heavy)',
+            '    set_property(TARGET ${target} PROPERTY JOB_POOL_COMPILE openusd_heavy)',
+            'endif()',
+        ]
+
+        functions += [
+            '',
+            '# skips OpenUSD libraries that are known components but were not requested, as well as',
+            '# plugins that link to any of those. Used by the patched `pxr_library` in Public.cmake',
+            'function(_conan_openusd_skip_library NAME out)',
+            '    set(${out} FALSE PARENT_SCOPE)',
+            '    if(NOT DEFINED PXR_CONAN_COMPONENTS)',
+            '        return()',
+            '    endif()',
+            '    cmake_parse_arguments(args',
+        ] + self._pxr_library_keywords + [
+            '        ${ARGN})',
+            '    set(deps ${NAME})',
+            '    if(args_TYPE STREQUAL "PLUGIN")',
+            '        set(deps ${args_LIBRARIES})',
+            '    endif()',
+            '    foreach(dep ${deps})',
+            '        if(dep IN_LIST PXR_CONAN_ALL_COMPONENTS AND NOT dep IN_LIST PXR_CONAN_COMPONENTS)',
+            '            set(${out} TRUE PARENT_SCOPE)',
+            '        endif()',
+            '    endforeach()',
+            'endfunction()',
+        ]
+
+        finish = []
+        if self.options.unity_build:
+            functions += self._unity_build_functions()
+            body += ['_conan_openusd_unity_exclude(${target})']
+            finish += ['_conan_openusd_unity_report()']
+
+        if self.options.precompiled_headers:
+            functions += self._precompiled_header_functions()
+            body += ['_conan_openusd_precompile_headers(${target})']
+
+        if link_options := self._startup_link_options():
+            body += [
+                'if(type MATCHES "^(SHARED_LIBRARY|MODULE_LIBRARY|EXECUTABLE)$")',
+                f'    target_link_options(${{target}} PRIVATE {" ".join(link_options)})',
+                'endif()',
+            ]
+
+        if malloc := self._malloc_library():
+            # Linked privately into the library that has arch (instead of through OpenUSD's
+            # PXR_MALLOC_LIBRARY), so the exported link interface of a shared arch doesn't carry it,
+            # and `package_info()` declares it instead
+            package, malloc_target = malloc
+            functions += ['', f'find_package({package} REQUIRED CONFIG)']
+            body += [
+                f'if(target STREQUAL "{"usd_ms" if self.options.monolithic else "arch"}")',
+                f'    target_link_libraries(${{target}} PRIVATE {malloc_target})',
+            ]
+            if self.settings.os in ['Linux', 'FreeBSD']:
+                # arch doesn't call into the allocator, so make sure the linker keeps it as a
+                # dependency. Comes after the fast_startup options, and arch's own libraries
+                # (libdl, libm) are needed anyway
+                body += [
+                    '    if(type STREQUAL "SHARED_LIBRARY")',
+                    '        target_link_options(${target} PRIVATE "LINKER:--no-as-needed")',
+                    '    endif()',
+                ]
+            body += ['endif()']
+
+        return functions, body, finish
+
+
+    def _startup_link_options(self):
+        # Link options of the `fast_startup` option, which cut the work the dynamic loader does when
+        # a process loads the OpenUSD libraries:
+        #   --as-needed: drop DT_NEEDED entries for libraries that aren't used, so they aren't loaded
+        #   --hash-style=gnu, -O1: GNU hash tables only, and optimized for faster lookups
+        #   -Bsymbolic-functions: calls to functions defined in the same library are bound at link
+        #       time instead of being looked up by the loader (the ELF analogue of direct binding).
+        #       Data symbols (typeinfo, statics) still go through the usual lookup, so they stay unique
+        #   --exclude-libs,ALL: don't re-export the symbols of static libraries linked into OpenUSD
+        # `-z now` (full relro) is left out on purpose, it resolves every symbol at load time
+        if not self.options.fast_startup:
+            return []
+        if self.settings.os in ['Linux', 'FreeBSD'] and str(self.settings.compiler) in ['gcc', 'clang']:
+            return [
+                'LINKER:--as-needed',
+                'LINKER:--hash-style=gnu',
+                'LINKER:-O1',
+                'LINKER:-Bsymbolic-functions',
+                'LINKER:--exclude-libs,ALL',
+            ]
+        if self.settings.os == 'Macos':
+            # two-level namespaces already avoid flat symbol lookups, only the unused dylibs can go
+            return ['LINKER:-dead_strip_dylibs']
+        return []
+
+
+    # the keyword arguments of OpenUSD's `pxr_library`, as passed to cmake_parse_arguments
+    _pxr_library_keywords = [
+        '        "DISABLE_PRECOMPILED_HEADERS;INCLUDE_SCHEMA_FILES"',
+        '        "TYPE;PRECOMPILED_HEADER_NAME"',
+        '        "LIBRARIES;INCLUDE_DIRS;PUBLIC_CLASSES;PUBLIC_HEADERS;PRIVATE_CLASSES;PRIVATE_HEADERS;CPPFILES;PYMODULE_CPPFILES;PYMODULE_FILES;PYSIDE_UI_FILES;RESOURCE_FILES;DOXYGEN_FILES"',
+    ]
+
+    def _precompiled_header_functions(self):
+        # Every OpenUSD library has a pch.h with its heavy includes (boost, tbb, tf, vt...). They are
+        # compiled with cmake's target_precompile_headers instead of OpenUSD's own PCH support, so
+        # that the PCH is built with exactly the same flags and include paths as the sources,
+        # including the ones that come from the conan boost/onetbb targets. The python wrap module
+        # of a library (`_tf`) uses the same header
+        return [
+            '',
+            'function(_conan_openusd_library_pch NAME)',
+            '    cmake_parse_arguments(args',
+        ] + self._pxr_library_keywords + [
+            '        ${ARGN})',
+            '    if(args_DISABLE_PRECOMPILED_HEADERS)',
+            '        return()',
+            '    endif()',
+            '    if(NOT args_PRECOMPILED_HEADER_NAME)',
+            '        set(args_PRECOMPILED_HEADER_NAME pch.h)',
+            '    endif()',
+            '    set(header "${CMAKE_CURRENT_SOURCE_DIR}/${args_PRECOMPILED_HEADER_NAME}")',
+            '    if(EXISTS "${header}")',
+            '        set_property(GLOBAL PROPERTY _conan_openusd_pch_${NAME} "${header}")',
+            '    endif()',
+            'endfunction()',
+            '',
+            'function(_conan_openusd_precompile_headers target)',
+            '    string(REGEX REPLACE "^_" "" library ${target})',
+            '    get_property(header GLOBAL PROPERTY _conan_openusd_pch_${library})',
+            '    if(header)',
+            '        target_precompile_headers(${target} PRIVATE "$<$<COMPILE_LANGUAGE:CXX>:${header}>")',
+            '    endif()',
+            'endfunction()',
+        ]
+
+
+    def _unity_build_functions(self):
+        # Sources that define the same file-local name as another source of their library (private
+        # tokens, registry functions, statics, anonymous namespaces, leftover macros) would fail to
+        # compile in the same batch. `unitycheck.py` finds them, and they're compiled on their own
+        collisions, total = unitycheck.scan_tree(self.source_folder)
+        self.output.info(f'Unity build: {len(collisions)} of {total} sources define names that collide with '
+                         'another source of their library, they are compiled on their own')
+        excluded = [Path(path).as_posix() for path in collisions]
+        return [
+            '',
+            'function(_conan_openusd_unity_exclude target)',
+            '    set(excluded_sources',
+        ] + [f'        "{path}"' for path in excluded] + [
+            '    )',
+            '    get_target_property(src_dir ${target} SOURCE_DIR)',
+            '    get_target_property(sources ${target} SOURCES)',
+            '    set(excluded)',
+            '    set(batched 0)',
+            '    foreach(src ${sources})',
+            '        if(src MATCHES "\\$<" OR NOT src MATCHES "\\.cpp$")',
+            '            continue()',
+            '        endif()',
+            '        if(IS_ABSOLUTE "${src}")',
+            '            set(path "${src}")',
+            '        else()',
+            '            set(path "${src_dir}/${src}")',
+            '        endif()',
+            '        if(path IN_LIST excluded_sources)',
+            '            list(APPEND excluded "${path}")',
+            '        else()',
+            '            math(EXPR batched "${batched} + 1")',
+            '        endif()',
+            '    endforeach()',
+            '    if(excluded)',
+            '        set_property(SOURCE ${excluded} TARGET_DIRECTORY ${target} PROPERTY SKIP_UNITY_BUILD_INCLUSION ON)',
+            '    endif()',
+            '    list(LENGTH excluded excluded_count)',
+            '    set_property(GLOBAL APPEND PROPERTY _conan_openusd_unity_batched ${batched})',
+            '    set_property(GLOBAL APPEND PROPERTY _conan_openusd_unity_excluded ${excluded_count})',
+            'endfunction()',
+            '',
+            'function(_conan_openusd_unity_report)',
+            '    foreach(kind batched excluded)',
+            '        get_property(counts GLOBAL PROPERTY _conan_openusd_unity_${kind})',
+            '        set(${kind} 0)',
+            '        foreach(count ${counts})',
+            '            math(EXPR ${kind} "${${kind}} + ${count}")',
+            '        endforeach()',
+            '    endforeach()',
+            '    message(STATUS "Unity build: ${batched} sources batched, ${excluded} compiled on their own")',
+            'endfunction()',
+        ]
+
+
+    def _cmake_project_hooks(self):
+        # cmake code run right after OpenUSD's `project()`, once the compilers have been detected
+        hooks = []
+        if self.options.lto != 'off':
+            compiler = str(self.settings.compiler)
+            if compiler in ['clang', 'apple-clang']:
+                # cmake picks thin LTO for clang by default, make it follow the option instead
+                flag = f'-flto={self.options.lto}'
+                hooks += [
+                    'foreach(lang C CXX)',
+                    f'    set(CMAKE_${{lang}}_COMPILE_OPTIONS_IPO {flag})',
+                    f'    set(CMAKE_${{lang}}_LINK_OPTIONS_IPO {flag})',
+                    'endforeach()',
+                ]
+            elif compiler == 'gcc' and self.options.lto == 'thin':
+                # gcc has no thin LTO, but its default (WHOPR with -flto=auto) is also partitioned
+                # and parallel, so it's the closest equivalent
+                self.output.info('gcc has no thin LTO, using its default partitioned LTO')
+
+        if self.options.pgo:
+            hooks += [
+                'if(PXR_CONAN_PGO_FLAGS)',
+                '    add_compile_options(${PXR_CONAN_PGO_FLAGS})',
+                '    add_link_options(${PXR_CONAN_PGO_FLAGS})',
+                'endif()',
+            ]
+        return hooks
+
+
+    def _generate_cmake_hooks(self, tc):
+        # OpenUSD creates its targets from many nested CMakeLists.txt, so the only way to touch
+        # their properties from the recipe is to inject a file into the top-level project and
+        # defer the calls until every target exists
+        functions, body, finish = self._cmake_target_hooks()
+        indent = ' ' * 8
+
+        hooks = [
+            '# generated by the openusd conan recipe',
+            '# needs cmake_language(DEFER). The policies are only set for this file (and the functions',
+            '# it defines), not for the OpenUSD project that includes it',
+            'if(CMAKE_VERSION VERSION_LESS 3.19)',
+            '    message(FATAL_ERROR "The openusd conan recipe needs CMake 3.19 or newer, found ${CMAKE_VERSION}")',
+            'endif()',
+            'cmake_policy(PUSH)',
+            'cmake_policy(VERSION 3.19)',
+            '',
+            'function(_conan_openusd_all_targets dir out)',
+            '    get_property(targets DIRECTORY "${dir}" PROPERTY BUILDSYSTEM_TARGETS)',
+            '    get_property(subdirs DIRECTORY "${dir}" PROPERTY SUBDIRECTORIES)',
+            '    foreach(subdir ${subdirs})',
+            '        _conan_openusd_all_targets("${subdir}" sub_targets)',
+            '        list(APPEND targets ${sub_targets})',
+            '    endforeach()',
+            '    set(${out} ${targets} PARENT_SCOPE)',
+            'endfunction()',
+            '',
+        ] + functions + [''] + self._cmake_project_hooks() + [
+            '',
+            'function(_conan_openusd_finalize)',
+            '    _conan_openusd_all_targets("${CMAKE_SOURCE_DIR}" all_targets)',
+            '    foreach(target ${all_targets})',
+            '        get_target_property(type ${target} TYPE)',
+            '        if(type STREQUAL "INTERFACE_LIBRARY" OR type STREQUAL "UTILITY")',
+            '            continue()',
+            '        endif()',
+        ] + [indent + line for line in body] + [
+            '    endforeach()',
+        ] + ['    ' + line for line in finish] + [
+            'endfunction()',
+            '',
+            'cmake_language(DEFER DIRECTORY "${CMAKE_SOURCE_DIR}" CALL _conan_openusd_finalize)',
+            'cmake_policy(POP)',
+        ]
+        save(self, self._cmake_hooks_file(), '\n'.join(hooks) + '\n')
+        tc.cache_variables['CMAKE_PROJECT_INCLUDE'] = self._cmake_hooks_file().as_posix()
+
+        # job pools are only honored by the Ninja generators, other generators just use `jobs`
+        jobs, heavy_jobs = self._build_jobs()
+        tc.cache_variables['CMAKE_JOB_POOLS'] = f'openusd_heavy={heavy_jobs};openusd_light={jobs}'
+        tc.cache_variables['CMAKE_JOB_POOL_COMPILE'] = 'openusd_light'
+        self.output.info(f'Build parallelism: {jobs} jobs, {heavy_jobs} for memory-heavy targets')
+
+
+    def _reproducible_prefix_map(self):
+        # Absolute folders of the build and their stable replacements in the outputs, ordered from
+        # the least to the most specific (gcc uses the last matching map, clang the longest)
+        prefixes = {
+            self.source_folder: '/openusd/src',
+            self.build_folder: '/openusd/build',
+        }
+        for dependency in self.dependencies.host.values():
+            if dependency.package_folder:
+                prefixes[dependency.package_folder] = f'/conan/{dependency.ref.name}'
+        return sorted(prefixes.items(), key=lambda item: len(item[0]))
+
+
+    def _source_date_epoch(self):
+        # the sources' own timestamp (as extracted from the upstream archive), or the conf value
+        epoch = self.conf.get('user.openusd:source_date_epoch', check_type=int)
+        if epoch is None:
+            epoch = int((Path(self.source_folder)/'CMakeLists.txt').stat().st_mtime)
+        return epoch
+
+
+    def _generate_reproducible(self, tc):
+        if not self.options.reproducible:
+            return
+
+        if self.options.pgo:
+            self.output.warning('The PGO profiles depend on the timing of the multithreaded training run, reproducible builds with pgo may still differ')
+
+        env = Environment()
+        # __DATE__/__TIME__, and the timestamps embedded by python's compileall
+        env.define('SOURCE_DATE_EPOCH', str(self._source_date_epoch()))
+
+        if str(self.settings.compiler) in ['gcc', 'clang', 'apple-clang']:
+            # the folders end up in the debug info, __FILE__ and assertion messages
+            for path, replacement in self._reproducible_prefix_map():
+                for flags in [tc.extra_cflags, tc.extra_cxxflags]:
+                    flags.append(f'-ffile-prefix-map={path}={replacement}')
+        elif str(self.settings.compiler) == 'msvc':
+            for flags in [tc.extra_cflags, tc.extra_cxxflags, tc.extra_sharedlinkflags, tc.extra_exelinkflags]:
+                flags.append('/Brepro')
+
+        if self.settings.os in ['Macos', 'iOS']:
+            # Apple's ar has no deterministic mode, it zeroes the member dates with this instead
+            env.define('ZERO_AR_DATE', '1')
+        elif str(self.settings.compiler) in ['gcc', 'clang']:
+            # zero timestamps/uids in static archives, and a content-based build id
+            for lang in ['C', 'CXX']:
+                tc.cache_variables[f'CMAKE_{lang}_ARCHIVE_CREATE'] = '<CMAKE_AR> qcD <TARGET> <LINK_FLAGS> <OBJECTS>'
+                tc.cache_variables[f'CMAKE_{lang}_ARCHIVE_APPEND'] = '<CMAKE_AR> qD <TARGET> <LINK_FLAGS> <OBJECTS>'
+                tc.cache_variables[f'CMAKE_{lang}_ARCHIVE_FINISH'] = '<CMAKE_RANLIB> -D <TARGET>'
+            tc.extra_sharedlinkflags.append('-Wl,--build-id=sha1')
+            tc.extra_exelinkflags.append('-Wl,--build-id=sha1')
+
+        # link with the install rpath right away, so no build folder is ever written into the binaries
+        tc.cache_variables['CMAKE_BUILD_WITH_INSTALL_RPATH'] = True
+        env.vars(self, scope='build').save_script('conanopenusd_reproducible')
+
+
+    def _has_debug_info(self):
+        return str(self.settings.build_type) in ['Debug', 'RelWithDebInfo']
+
+
+    def _generate_debug_info(self, tc):
+        if (self.options.split_dwarf or self.options.separate_debug_info) and not self._has_debug_info():
+            self.output.warning(f'build_type={self.settings.build_type} has no debug info, split_dwarf/separate_debug_info have no effect')
+            return
+
+        if self.options.split_dwarf:
+            # the linker only sees small skeleton units instead of all the DWARF of every object
+            tc.extra_cflags.append('-gsplit-dwarf')
+            tc.extra_cxxflags.append('-gsplit-dwarf')
+
+        if self.options.separate_debug_info:
+            # the debug files are named after the build id, see `_separate_debug_info()`
+            tc.extra_sharedlinkflags.append('-Wl,--build-id')
+            tc.extra_exelinkflags.append('-Wl,--build-id')
+
+        if self.conf.get('user.openusd:compress_debug_sections', default=False, check_type=bool):
+            for flags in [tc.extra_cflags, tc.extra_cxxflags, tc.extra_sharedlinkflags, tc.extra_exelinkflags]:
+                flags.append('-gz')
+
+
+    _compiler_caches = ['ccache', 'sccache']
+
+    def _compiler_cache(self):
+        # `user.openusd:compiler_cache` is a conf rather than an option so that it doesn't affect
+        # the package id. Returns the path to the cache executable, or None if disabled
+        name = self.conf.get('user.openusd:compiler_cache', check_type=str)
+        if not name:
+            return None
+        if name not in self._compiler_caches:
+            raise ConanInvalidConfiguration(f'user.openusd:compiler_cache must be one of {self._compiler_caches}, got "{name}"')
+        exe = shutil.which(name)
+        if not exe:
+            raise ConanInvalidConfiguration(f'user.openusd:compiler_cache is set to "{name}", but it was not found in PATH')
+        return exe
+
+
+    def _generate_compiler_cache(self, tc):
+        exe = self._compiler_cache()
+        if not exe:
+            return
+        for lang in ['C', 'CXX']:
+            tc.cache_variables[f'CMAKE_{lang}_COMPILER_LAUNCHER'] = exe
+
+        # make cache keys independent of the conan build folder, so that hits carry over between
+        # builds with different options/profiles (which get a different folder each)
+        base_dir = os.path.commonpath([self.source_folder, self.build_folder])
+        env = Environment()
+        if Path(exe).stem == 'ccache':
+            env.define('CCACHE_BASEDIR', base_dir)
+            env.define('CCACHE_NOHASHDIR', 'true')
+            sloppiness = 'include_file_ctime,include_file_mtime,time_macros'
+            if self.options.precompiled_headers:
+                sloppiness += ',pch_defines'
+            env.define('CCACHE_SLOPPINESS', sloppiness)
+        else:
+            env.define('SCCACHE_BASEDIRS', base_dir)
+        env.vars(self, scope='build').save_script('conanopenusd_compiler_cache')
+
+
+    def _compiler_cache_stats(self):
+        # The counters of the compiler cache as {name: value}, or None. They're shared by everything
+        # that uses the cache, so they're never reset: the build reports the difference between a
+        # snapshot before and one after it (which also counts other builds running at the same time)
+        exe = self._compiler_cache()
+        if not exe:
+            return None
+        out = io.StringIO()
+        stats = {}
+        if Path(exe).stem == 'ccache':
+            # tab-separated `name value` lines (ccache 4.x)
+            self.run(f'"{exe}" --print-stats', stdout=out, quiet=True)
+            for line in out.getvalue().splitlines():
+                name, _, value = line.partition('\t')
+                if value.strip().isdigit() and not name.endswith('timestamp'):
+                    stats[name] = int(value)
+        else:
+            self.run(f'"{exe}" --show-stats --stats-format=json', stdout=out, quiet=True)
+            def flatten(value, prefix):
+                if isinstance(value, dict):
+                    for key, item in value.items():
+                        flatten(item, f'{prefix}{key}.')
+                elif isinstance(value, int) and not isinstance(value, bool):
+                    stats[prefix[:-1]] = value
+            flatten(json.loads(out.getvalue()).get('stats', {}), '')
+        return stats
+
+
+    def _report_compiler_cache_stats(self, before):
+        after = self._compiler_cache_stats()
+        if before is None or after is None:
+            return
+        diff = {name: value - before.get(name, 0) for name, value in after.items() if value != before.get(name, 0)}
+        self.output.info(f'{Path(self._compiler_cache()).stem} statistics for this build:')
+        for name, value in sorted(diff.items()):
+            self.output.info(f'  {name}: {value}')
+
+
+    def _malloc_library(self):
+        # (cmake package, cmake target) of the allocator to link into arch, or None for the system malloc
+        if self.options.allocator == 'tbbmalloc':
+            dependency = self.dependencies["onetbb"]
+            info = dependency.cpp_info.components["tbbmalloc_proxy"]
+            return dependency.cpp_info.get_property('cmake_file_name') or 'TBB', \
+                info.get_property('cmake_target_name') or 'TBB::tbbmalloc_proxy'
+        if self.options.allocator == 'jemalloc':
+            dependency = self.dependencies["jemalloc"]
+            return dependency.cpp_info.get_property('cmake_file_name') or 'jemalloc', \
+                dependency.cpp_info.get_property('cmake_target_name') or 'jemalloc::jemalloc'
+        return None
+
+
+    def _generator(self):
+        # prefer Ninja when it's available, unless a generator is set explicitly in the profile
+        generator = self.conf.get('tools.cmake.cmaketoolchain:generator', check_type=str)
+        if not generator and shutil.which('ninja'):
+            generator = 'Ninja'
+        return generator
+
+
+    def _uses_ninja(self):
+        return 'Ninja' in str(self._generator())
 
 
     def generate(self):
-        tc = CMakeToolchain(self)
+        tc = CMakeToolchain(self, generator=self._generator())
         dep = CMakeDeps(self)
         
         tc.variables['BUILD_SHARED_LIBS'] = self.options.shared
 
+        self._generate_cmake_hooks(tc)
+        self._generate_compiler_cache(tc)
+
+        position_independent = self.options.shared or self.options.get_safe('fPIC', False)
+        if self.options.hidden_visibility and str(self.settings.compiler) in ['gcc', 'clang'] and position_independent:
+            # calls between functions of the same library no longer have to go through the PLT
+            tc.extra_cflags.append('-fno-semantic-interposition')
+            tc.extra_cxxflags.append('-fno-semantic-interposition')
+
+        if self.options.precompiled_headers and str(self.settings.compiler) == 'gcc':
+            # gcc silently falls back to parsing the headers when a PCH can't be used
+            tc.extra_cxxflags.append('-Werror=invalid-pch')
+
+        self._generate_debug_info(tc)
+        self._generate_reproducible(tc)
+
+        if self.conf.get('user.openusd:time_trace', default=False, check_type=bool):
+            if str(self.settings.compiler) in ['clang', 'apple-clang']:
+                tc.extra_cxxflags.append('-ftime-trace')
+            else:
+                self.output.warning('user.openusd:time_trace is only supported by clang, ignoring it')
+
         # this helps OpenUSD build scripts find CMake targets from conan dependencies
         # (kind of like aliases for cmake target names)
 
         tc.variables['TBB_tbb_LIBRARY'] = self.dependencies["onetbb"].cpp_info.get_property('cmake_target_name')
 
-        if self.options.ptex:
+        if self._uses('ptex'):
             tc.variables['PTEX_LIBRARY'] = self.dependencies["ptex"].cpp_info.get_property('cmake_target_name')
 
-        if self.options.draco:
+        if self._uses('draco'):
             tc.variables['DRACO_LIBRARY'] = self.dependencies["draco"].cpp_info.get_property('cmake_target_name')
 
-        if self.options.openvdb:
+        if self._uses('openvdb'):
             tc.variables['OPENVDB_LIBRARY'] = self.dependencies["openvdb"].cpp_info.get_property('cmake_target_name')
 
-        if self.options.alembic:
+        if self._uses('alembic'):
             tc.variables['ALEMBIC_LIBRARIES'] = self.dependencies["alembic"].cpp_info.get_property('cmake_target_name')
             tc.variables['PXR_ENABLE_HDF5_SUPPORT'] = self.dependencies["alembic"].options.with_hdf5
             tc.variables['ALEMBIC_FOUND'] = True
 
-        boost_py_ver = str(self.dependencies["boost"].options.python_version).replace('.', '')
-        tc.variables[f'Boost_PYTHON{boost_py_ver}_LIBRARY'] = "Boost::python"
+        if self.options.python:
+            boost_py_ver = str(self.dependencies["boost"].options.python_version).replace('.', '')
+            tc.variables[f'Boost_PYTHON{boost_py_ver}_LIBRARY'] = "Boost::python"
 
-        dep.set_property("opensubdiv", "cmake_additional_variables_prefixes", ["OPENSUBDIV"]) # capitalize the name
-        osd_info = self.dependencies["opensubdiv"].cpp_info
-        tc.variables['OPENSUBDIV_OSDCPU_LIBRARY'] = osd_info.components['osdcpu'].get_property('cmake_target_name')
-        tc.variables['OPENSUBDIV_OSDGPU_LIBRARY'] = osd_info.components['osdgpu'].get_property('cmake_target_name')
+        if self._component_enabled('pxOsd'):
+            dep.set_property("opensubdiv", "cmake_additional_variables_prefixes", ["OPENSUBDIV"]) # capitalize the name
+            osd_info = self.dependencies["opensubdiv"].cpp_info
+            tc.variables['OPENSUBDIV_OSDCPU_LIBRARY'] = osd_info.components['osdcpu'].get_property('cmake_target_name')
+            tc.variables['OPENSUBDIV_OSDGPU_LIBRARY'] = osd_info.components['osdgpu'].get_property('cmake_target_name')
 
-        if self.options.embree:
+        if self._uses('embree3'):
             tc.variables['EMBREE_FOUND'] = True
             dep.set_property("embree3", "cmake_additional_variables_prefixes", ["EMBREE"])
             tc.variables['EMBREE_LIBRARY'] = self.dependencies["embree3"].cpp_info.get_property('cmake_target_name')
 
-        if self.options.openimageio:
+        if self._uses('opencolorio'):
             dep.set_property("opencolorio", "cmake_additional_variables_prefixes", ["OCIO"])
 
-        if self.options.opencolorio:
+        if self._uses('openimageio'):
             dep.set_property("openimageio", "cmake_additional_variables_prefixes", ["OIIO"])
 
-        if self.options.materialx:
+        if self._uses('materialx'):
             # create aliases like 'materialx::MaterialXCore' => 'MaterialXCore'
             # materialx conan package produces the former, openusd expects the latter
             mtx = self.dependencies["materialx"]
@@ -243,273 +1064,758 @@ class OpenUSD(ConanFile):
 
 
     _cmake = None
-    def _configure_cmake(self):
-        if self._cmake:
+    _cmake_pgo_stage = None
+    def _configure_cmake(self, pgo_stage='use'):
+        # `pgo_stage` is either 'generate' (instrumented build) or 'use' (optimized with the
+        # collected profiles), and is ignored unless the pgo option is enabled
+        if self._cmake and self._cmake_pgo_stage == pgo_stage:
             return self._cmake
+        self._cmake_pgo_stage = pgo_stage
         self._patch_sources_cmake()
+
+        # the command-line tools and usdview expect (most of) the full set of libraries
+        build_all = self._wanted_components() is None
+        build_imaging = self.options.imaging and any(self._component_enabled(c) for c in self._imaging_components)
+        build_usdimaging = self.options.usdimaging and any(self._component_enabled(c) for c in self._usdimaging_components)
+
+        variables = {
+            'PXR_BUILD_MONOLITHIC': self.options.monolithic,
+
+            'PXR_PREFER_SAFETY_OVER_SPEED': self.options.safety_over_speed,
+
+            'CMAKE_INTERPROCEDURAL_OPTIMIZATION': self.options.lto != 'off',
+            'CMAKE_C_VISIBILITY_PRESET': 'hidden' if self.options.hidden_visibility else 'default',
+            'CMAKE_CXX_VISIBILITY_PRESET': 'hidden' if self.options.hidden_visibility else 'default',
+            'CMAKE_VISIBILITY_INLINES_HIDDEN': self.options.hidden_visibility,
+
+            'CMAKE_UNITY_BUILD': self.options.unity_build,
+            'CMAKE_UNITY_BUILD_BATCH_SIZE': int(self.options.unity_build_batch_size),
+
+            # replaced by target_precompile_headers when the precompiled_headers option is enabled
+            'PXR_ENABLE_PRECOMPILED_HEADERS': False,
+
+            'PXR_ENABLE_PYTHON_SUPPORT': self.options.python,
+            'PXR_ENABLE_GL_SUPPORT': True,
+            'PXR_ENABLE_VULKAN_SUPPORT': False, # for hgiVulkan, may need to patch `cmake/defaults/Packages.cmake`
+            'PXR_ENABLE_OSL_SUPPORT': False, # currently, no OSL conan package exists
+            'PXR_ENABLE_OPENVDB_SUPPORT': self._uses('openvdb'),
+
+            'PXR_BUILD_EMBREE_PLUGIN': self._uses('embree3'),
+            'PXR_BUILD_PRMAN_PLUGIN': False,
+            'PXR_BUILD_ALEMBIC_PLUGIN': self._uses('alembic'),
+            'PXR_BUILD_DRACO_PLUGIN': self._uses('draco'),
+
+            'PXR_BUILD_DOCUMENTATION': False,
+            'PXR_BUILD_TESTS': False,
+            'PXR_BUILD_EXAMPLES': False,
+            'PXR_BUILD_TUTORIALS': False,
+            
+            'PXR_BUILD_IMAGING': build_imaging,
+            'PXR_BUILD_USD_IMAGING': build_usdimaging,
+            'PXR_BUILD_USD_TOOLS': self.options.tools and build_all,
+            'PXR_BUILD_USDVIEW': self.options.tools and self.options.python and build_all,
+            
+            'PXR_ENABLE_PTEX_SUPPORT': self._uses('ptex'),
+            'PXR_ENABLE_MATERIALX_SUPPORT': self._uses('materialx'),
+            'PXR_BUILD_OPENCOLORIO_PLUGIN': self._uses('opencolorio'),
+            'PXR_BUILD_OPENIMAGEIO_PLUGIN': self._uses('openimageio'),
+        }
+
+        if self.options.pgo:
+            variables['PXR_CONAN_PGO_FLAGS'] = ';'.join(self._pgo_flags(pgo_stage))
+
+        if not build_all:
+            variables['PXR_CONAN_COMPONENTS'] = ';'.join(sorted(self._wanted_components()))
+            variables['PXR_CONAN_ALL_COMPONENTS'] = ';'.join(self._component_infos().keys())
+
         self._cmake = CMake(self)
-        self._cmake.configure(
-            variables = {
-                'PXR_BUILD_MONOLITHIC': False,
-
-                'PXR_PREFER_SAFETY_OVER_SPEED': self.options.safety_over_speed,
-
-                'PXR_ENABLE_PYTHON_SUPPORT': True,
-                'PXR_ENABLE_GL_SUPPORT': True,
-                'PXR_ENABLE_VULKAN_SUPPORT': False, # for hgiVulkan, may need to patch `cmake/defaults/Packages.cmake`
-                'PXR_ENABLE_OSL_SUPPORT': False, # currently, no OSL conan package exists
-                'PXR_ENABLE_OPENVDB_SUPPORT': self.options.openvdb,
-
-                'PXR_BUILD_EMBREE_PLUGIN': self.options.embree,
-                'PXR_BUILD_PRMAN_PLUGIN': False,
-                'PXR_BUILD_ALEMBIC_PLUGIN': self.options.alembic,
-                'PXR_BUILD_DRACO_PLUGIN': self.options.draco,
-
-                'PXR_BUILD_DOCUMENTATION': False,
-                'PXR_BUILD_TESTS': False,
-                'PXR_BUILD_EXAMPLES': False,
-                'PXR_BUILD_TUTORIALS': False,
-                
-                'PXR_BUILD_IMAGING': self.options.imaging,
-                'PXR_BUILD_USD_TOOLS': self.options.tools,
-                'PXR_BUILD_USDVIEW': self.options.tools,
-                
-                'PXR_ENABLE_PTEX_SUPPORT': self.options.ptex,
-                'PXR_ENABLE_MATERIALX_SUPPORT': self.options.materialx,
-                'PXR_BUILD_OPENCOLORIO_PLUGIN': self.options.opencolorio,
-                'PXR_BUILD_OPENIMAGEIO_PLUGIN': self.options.openimageio,
-            }
-        )
+
+        # skip the (long) configure step when nothing that feeds it changed since the last one, e.g.
+        # in package() right after build(), or when iterating with `conan build`. Otherwise cmake
+        # reconfigures on top of the existing cache
+        fingerprint = self._configure_fingerprint(variables)
+        stamp = Path(self.build_folder)/'conan_openusd_configure.sha256'
+        if (Path(self.build_folder)/'CMakeCache.txt').is_file() and stamp.is_file() and stamp.read_text() == fingerprint:
+            self.output.info('CMake configuration is up to date, skipping the configure step')
+        else:
+            stamp.unlink(missing_ok=True)
+            self._cmake.configure(variables = variables)
+            save(self, stamp, fingerprint)
         return self._cmake
 
 
+    def _configure_fingerprint(self, variables):
+        # The options and settings reach cmake through `variables`, the toolchain and the cache
+        # variables of the preset (passed as -D, e.g. the compiler launcher, job pools, hooks file
+        # and reproducible archive commands), and the dependencies' cpp_info through the CMakeDeps
+        # files, all of them in the generators folder
+        h = hashlib.sha256()
+        h.update(json.dumps({k: str(v) for k, v in variables.items()}, sort_keys=True).encode())
+        h.update(str(self._generator()).encode())
+        presets = Path(self.generators_folder)/'CMakePresets.json'
+        if presets.is_file():
+            configure_presets = json.loads(presets.read_text()).get('configurePresets', [])
+            cache_variables = [preset.get('cacheVariables', {}) for preset in configure_presets]
+            h.update(json.dumps(cache_variables, sort_keys=True).encode())
+        for path in sorted(Path(self.generators_folder).glob('*.cmake')):
+            h.update(path.name.encode())
+            h.update(path.read_bytes())
+        return h.hexdigest()
+
+
     def build(self):
-        cmake = self._configure_cmake()
-        self.run(f'cmake --build "{self.build_folder}" --config Release -- -j24')
+        if self.options.pgo:
+            self._pgo_train()
+        self._configure_cmake()
+        self._cmake_build()
+        self._build_report()
+
+
+    def _pgo_profile_dir(self):
+        return Path(self.build_folder)/'pgo-profiles'
+
+
+    def _pgo_flags(self, stage):
+        profiles = self._pgo_profile_dir().as_posix()
+        if stage == 'generate':
+            # the instrumented code runs on many TBB threads at once
+            return [f'-fprofile-generate={profiles}', '-fprofile-update=atomic']
+        if str(self.settings.compiler) in ['clang', 'apple-clang']:
+            return [f'-fprofile-use={profiles}/merged.profdata', '-Wno-profile-instr-unprofiled', '-Wno-profile-instr-out-of-date']
+        return [f'-fprofile-use={profiles}', '-fprofile-correction', '-Wno-missing-profile']
+
+
+    def _python_executable(self):
+        # the interpreter OpenUSD was configured against, which isn't necessarily the one running conan
+        cache = Path(self.build_folder)/'CMakeCache.txt'
+        if cache.is_file():
+            m = re.search(r'^Python3?_EXECUTABLE:[A-Z]+=(.+)$', cache.read_text(), re.MULTILINE)
+            if m:
+                return m.group(1).strip()
+        return shutil.which('python3') or 'python'
+
+
+    def _pgo_train(self):
+        # stage 1: instrumented build, installed into the build folder so the tools and python
+        # bindings can be used to run the training workload
+        rmdir(self, self._pgo_profile_dir())
+        self._configure_cmake(pgo_stage='generate')
+        self._cmake_build()
+
+        stage = Path(self.build_folder)/'pgo-install'
+        rmdir(self, stage)
+        self.run(f'cmake --install "{self.build_folder}" --config {self.settings.build_type} --prefix "{stage}"')
+
+        env = Environment()
+        env.prepend_path('PATH', str(stage/'bin'))
+        env.prepend_path('PYTHONPATH', str(stage/'lib'/'python'))
+        env.prepend_path('LD_LIBRARY_PATH', str(stage/'lib'))
+        env.prepend_path('DYLD_LIBRARY_PATH', str(stage/'lib'))
+        env.vars(self, scope='pgo').save_script('conanopenusd_pgo')
+
+        workdir = Path(self.build_folder)/'pgo-workload'
+        rmdir(self, workdir)
+        script = Path(self.recipe_folder)/'pgo_training.py'
+        self.output.info('Running the PGO training workload')
+        self.run(f'"{self._python_executable()}" "{script}" "{workdir}"', env=['conanrun', 'conanopenusd_pgo'])
+
+        if str(self.settings.compiler) in ['clang', 'apple-clang']:
+            profdata = self.conf.get('user.openusd:llvm_profdata', check_type=str) or shutil.which('llvm-profdata')
+            if not profdata:
+                raise ConanException('llvm-profdata is needed to merge the PGO profiles, set user.openusd:llvm_profdata to its path')
+            profiles = self._pgo_profile_dir()
+            self.run(f'"{profdata}" merge -output="{profiles/"merged.profdata"}" "{profiles}"')
+        # stage 2 happens in `build()`, reconfiguring with the profiles recompiles everything
+
+
+    def _cmake_build(self):
+        jobs, heavy_jobs = self._build_jobs()
+        if not self._uses_ninja():
+            # without ninja job pools the heavy targets share the same -j as everything else, so
+            # stay conservative when memory is the bottleneck
+            jobs = max(heavy_jobs, (jobs + heavy_jobs) // 2)
+        cache_stats = self._compiler_cache_stats()
+        self.run(f'cmake --build "{self.build_folder}" --config {self.settings.build_type} --parallel {jobs}')
+        self._report_compiler_cache_stats(cache_stats)
+
+
+    def _build_report(self):
+        if not self._uses_ninja():
+            return
+        report = buildreport.make_report(self.build_folder)
+        save(self, Path(self.build_folder)/'build_report.json', json.dumps(report, indent=2))
+        save(self, Path(self.build_folder)/'build_report.md', buildreport.to_markdown(report))
+        self.output.info(f'Build report written to {Path(self.build_folder)/"build_report.md"}')
+        for name, info in list(report['components'].items())[:10]:
+            self.output.info(f'  {name}: {buildreport.fmt_ms(info["time"])}')
 
 
     def package(self):
-        cmake = self._configure_cmake()
-        cmake.install()
+        report = {}
+        start = time.perf_counter()
+        self._configure_cmake()
+        self._install_package(report)
+        if not self.options.reproducible:
+            # the timings differ between builds
+            for ext in ['json', 'md']:
+                copy(self, f'build_report.{ext}', self.build_folder, Path(self.package_folder)/'share'/'openusd')
+
+        if self.options.separate_debug_info and self._has_debug_info():
+            self._separate_debug_info()
+            if self.options.debug_info_package:
+                self._keep_only_debug_info()
+                if self.options.reproducible:
+                    self._make_reproducible()
+                return
+        elif self.options.split_dwarf and self._has_debug_info():
+            self._package_split_dwarf()
+
+        if self.options.strip:
+            self._strip_binaries(report)
+
+        if self.options.python and self._layer_includes('full'):
+            self._compile_python()
+
+        # merge every plugInfo.json into lib/usd/plugInfo.json, so plug reads a single file at startup
+        # instead of listing and opening the `*/resources/` folders of every plugin
+        count, problems = pluginindex.write_index(self.package_folder)
+        for problem in problems:
+            self.output.warning(f'Plugin index: {problem}')
+        self.output.info(f'Plugin index: {count} plugins')
+
+        if self.options.reproducible:
+            self._make_reproducible()
+
+        report['total_time'] = time.perf_counter() - start
+        save(self, Path(self.build_folder)/'package_report.json', json.dumps(report, indent=2))
+        self.output.info(f'Packaging took {report["total_time"]:.1f}s: install {report["install_time"]:.1f}s, '
+                         f'{report["files"]} files ({report["bytes"] / 2**20:.1f} MiB) placed in {report["place_time"]:.1f}s '
+                         f'({", ".join(f"{n} {m}" for m, n in report["methods"].items())})')
+        if report['skipped_files']:
+            self.output.info(f'package_layer={self.options.package_layer}: {report["skipped_files"]} installed files not packaged')
+        if 'strip_time' in report:
+            self.output.info(f'Stripping saved {report["stripped_bytes"] / 2**20:.1f} MiB in {report["strip_time"]:.1f}s')
+
+
+    # how `_install_package()` places the installed files in the package folder, in order of
+    # preference. Can be restricted with `user.openusd:package_files`
+    _package_file_methods = ['reflink', 'hardlink', 'copy']
+
+    def _install_package(self, report):
+        # cmake installs into a staging folder in the build folder, where reinstalling skips the
+        # files that are up to date (cmake replaces the changed ones rather than writing into them).
+        # The package folder is then populated from it with reflinks or hardlinks when both are on the
+        # same filesystem, which costs no data I/O, and with a parallel copy otherwise. Later steps
+        # that modify packaged files have to replace them instead of writing in place, so they don't
+        # change the staged files through a hardlink
+        stage = Path(self.build_folder)/'package-staging'
+        start = time.perf_counter()
+        self.run(f'cmake --install "{self.build_folder}" --config {self.settings.build_type} --prefix "{stage}"')
+        report['install_time'] = time.perf_counter() - start
+
+        manifest = Path(self.build_folder)/'install_manifest.txt'
+        files = [Path(f) for f in manifest.read_text().splitlines() if f] if manifest.is_file() else \
+            [p for p in stage.rglob('*') if p.is_file() or p.is_symlink()]
+        # the staging folder always has the whole install, `package_layer` picks the files packaged
+        layered = [f for f in files if self._layer_includes(self._file_layer(f.relative_to(stage)))]
+        report['skipped_files'] = len(files) - len(layered)
+        files = layered
+
+        mode = self.conf.get('user.openusd:package_files', default='auto', check_type=str)
+        if mode == 'auto':
+            methods = list(self._package_file_methods)
+            if os.stat(stage).st_dev != os.stat(self.package_folder).st_dev:
+                methods = ['copy']
+        elif mode in self._package_file_methods:
+            methods = [mode] if mode == 'copy' else [mode, 'copy']
+        else:
+            raise ConanException(f'user.openusd:package_files must be auto, {", ".join(self._package_file_methods)}, got "{mode}"')
+
+        start = time.perf_counter()
+        counts = defaultdict(int)
+        to_copy = []
+        for src in files:
+            dst = Path(self.package_folder)/src.relative_to(stage)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if src.is_symlink():
+                dst.unlink(missing_ok=True)
+                os.symlink(os.readlink(src), dst)
+                counts['symlink'] += 1
+                continue
+            # the first method that fails isn't tried again for the rest of the files
+            while methods[0] != 'copy':
+                try:
+                    dst.unlink(missing_ok=True)
+                    if methods[0] == 'reflink':
+                        self._reflink(src, dst)
+                    else:
+                        os.link(src, dst)
+                    counts[methods[0]] += 1
+                    break
+                except OSError as e:
+                    self.output.info(f'Can\'t {methods[0]} packaged files ({e.strerror}), falling back to {methods[1]}')
+                    dst.unlink(missing_ok=True)
+                    methods.pop(0)
+            else:
+                to_copy.append((src, dst))
+
+        jobs, _ = self._build_jobs()
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(lambda f: shutil.copy2(*f), to_copy))
+        if to_copy:
+            counts['copy'] += len(to_copy)
+
+        report['place_time'] = time.perf_counter() - start
+        report['files'] = len(files)
+        report['bytes'] = sum(f.stat().st_size for f in files if not f.is_symlink())
+        report['methods'] = dict(counts)
+
+
+    @staticmethod
+    def _reflink(src, dst):
+        # FICLONE: shares the extents of `src` (copy-on-write) on btrfs, xfs, bcachefs...
+        import fcntl
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), 0x40049409, s.fileno())
+        shutil.copystat(src, dst)
+
+
+    def _strip_binaries(self, report):
+        start = time.perf_counter()
+        objcopy = self.conf.get('user.openusd:objcopy', check_type=str) or shutil.which('objcopy')
+        if self.settings.os in ['Windows', 'Macos'] or not objcopy:
+            self.output.warning('strip is only supported for ELF binaries, with objcopy')
+            return
+        before = 0
+        after = 0
+        for binary in self._elf_binaries(self.package_folder):
+            before += binary.stat().st_size
+            # written to a new file and moved over the original, see `_install_package()`
+            tmp = binary.with_name(binary.name + '.stripped')
+            self.run(f'"{objcopy}" --strip-unneeded "{binary}" "{tmp}"', quiet=True)
+            shutil.copymode(binary, tmp)
+            os.replace(tmp, binary)
+            after += binary.stat().st_size
+        report['strip_time'] = time.perf_counter() - start
+        report['stripped_bytes'] = before - after
+
+
+    def _compile_python(self):
+        # Byte-compiles the bindings with the interpreter they were built for, so that imports from
+        # a read-only or shared cache don't recompile them on every launch. checked-hash pycs are
+        # validated against a hash of the source instead of its mtime, so they stay valid when the
+        # package is copied, and stripping the package folder from the embedded paths keeps them
+        # identical between cache locations. The scripts in `bin` run as __main__ and are never
+        # cached by python, but everything they import is
+        python_dir = Path(self.package_folder)/'lib'/'python'
+        if not python_dir.is_dir():
+            return
+        jobs, _ = self._build_jobs()
+        self.run(f'"{self._python_executable()}" -m compileall -q -j {jobs} --invalidation-mode checked-hash '
+                 f'-s "{self.package_folder}" "{python_dir}"')
+
+
+    def _make_reproducible(self):
+        # The exported cmake files name the dependencies' libraries by their absolute path in this
+        # machine's cache. They are rewritten with the same prefix map as the compiler flags (conan
+        # consumers use the CMakeDeps files instead). The timestamps are then clamped to
+        # SOURCE_DATE_EPOCH so that archives of the package folder are identical as well
+        prefixes = [(path.encode(), replacement.encode()) for path, replacement in reversed(self._reproducible_prefix_map())]
+        rewritten = 0
+        for path in sorted(Path(self.package_folder).rglob('*.cmake')):
+            if path.is_symlink():
+                continue
+            data = original = path.read_bytes()
+            for prefix, replacement in prefixes:
+                data = data.replace(prefix, replacement)
+            if data != original:
+                # replaced rather than rewritten, see `_install_package()`
+                tmp = path.with_name(path.name + '.tmp')
+                tmp.write_bytes(data)
+                shutil.copymode(path, tmp)
+                os.replace(tmp, path)
+                rewritten += 1
+
+        epoch = self._source_date_epoch()
+        for path in Path(self.package_folder).rglob('*'):
+            os.utime(path, (epoch, epoch), follow_symlinks=False)
+        os.utime(self.package_folder, (epoch, epoch))
+        self.output.info(f'Reproducible package: {rewritten} cmake files rewritten, timestamps set to {epoch}')
+
+
+    def _elf_binaries(self, folder):
+        # the separate debug files are ELF too, but aren't binaries
+        for path in sorted(Path(folder).rglob('*')):
+            if path.is_symlink() or not path.is_file() or path.suffix in ['.debug', '.dwp']:
+                continue
+            with open(path, 'rb') as f:
+                if f.read(4) == b'\x7fELF':
+                    yield path
+
+
+    def _build_id(self, binary):
+        out = io.StringIO()
+        self.run(f'readelf -n "{binary}"', stdout=out, quiet=True)
+        m = re.search(r'Build ID: ([0-9a-f]+)', out.getvalue())
+        return m.group(1) if m else None
+
+
+    def _dwp_tool(self):
+        # binutils' dwp can't read DWARF 5, the default of current gcc and clang
+        dwp = self.conf.get('user.openusd:dwp', check_type=str) or shutil.which('llvm-dwp') or shutil.which('dwp')
+        if not dwp:
+            self.output.warning('dwp not found, the .dwo files of the split DWARF build won\'t be packaged')
+        return dwp
+
+
+    def _debug_info_folder(self):
+        # The `.build-id` tree `_separate_debug_info()` writes. The debug info package publishes it
+        # as `lib/debug`. Otherwise it goes to `user.openusd:debug_info_folder` (e.g. a symbol server
+        # share), or stays in the build folder, which is only used to compute the debuglinks
+        if self.options.debug_info_package:
+            return Path(self.package_folder)/'lib'/'debug'
+        return Path(self.conf.get('user.openusd:debug_info_folder', default=str(Path(self.build_folder)/'debuginfo'), check_type=str))
+
+
+    def _separate_debug_info(self):
+        # Moves the debug info of every packaged binary to a `.build-id` tree (the layout gdb, lldb
+        # and debuginfod look up by build id), so consumers only download the stripped binaries.
+        # The debug info is shipped by the `debug_info_package=True` package of the same build, see
+        # `_debug_info_folder()`. With split_dwarf, the .dwo files of each binary are packed into a
+        # `.dwp` next to its debug file
+        folder = self._debug_info_folder()
+        objcopy = self.conf.get('user.openusd:objcopy', check_type=str) or shutil.which('objcopy')
+        if not objcopy:
+            raise ConanException('objcopy is needed for separate_debug_info, set user.openusd:objcopy to its path')
+        dwp = self._dwp_tool() if self.options.split_dwarf else None
+
+        count = 0
+        for binary in self._elf_binaries(self.package_folder):
+            build_id = self._build_id(binary)
+            if not build_id:
+                self.output.warning(f'{binary.name} has no build id, leaving its debug info in place')
+                continue
+            debug = folder/'.build-id'/build_id[:2]/f'{build_id[2:]}.debug'
+            debug.parent.mkdir(parents=True, exist_ok=True)
+            if dwp:
+                # has to read the skeleton units before they're stripped, they point to the .dwo files
+                self.run(f'"{dwp}" -e "{binary}" -o "{debug}.dwp"')
+            self.run(f'"{objcopy}" --only-keep-debug "{binary}" "{debug}"')
+            # written to a new file and moved over the original, see `_install_package()`
+            tmp = binary.with_name(binary.name + '.stripped')
+            self.run(f'"{objcopy}" --strip-debug --add-gnu-debuglink="{debug}" "{binary}" "{tmp}"')
+            shutil.copymode(binary, tmp)
+            os.replace(tmp, binary)
+            count += 1
+        self.output.info(f'Debug info of {count} binaries moved to {folder}')
+
+
+    def _keep_only_debug_info(self):
+        # the debug info package only has the `.build-id` tree of `lib/debug`
+        debug = Path(self.package_folder)/'lib'/'debug'
+        for path in sorted(Path(self.package_folder).rglob('*'), reverse=True):
+            if path == debug or debug in path.parents or path in debug.parents:
+                continue
+            if path.is_dir() and not path.is_symlink():
+                path.rmdir()
+            else:
+                path.unlink()
+
+
+    def _package_split_dwarf(self):
+        # The packaged binaries only have skeleton units pointing to the .dwo files of the build
+        # folder. They're packed into a `<binary>.dwp` next to each binary, where debuggers look
+        # for it, so the package doesn't depend on the build folder
+        if self.options.strip:
+            self.output.warning('strip removes the skeleton units of the split DWARF, the .dwo files won\'t be packaged')
+            return
+        dwp = self._dwp_tool()
+        if not dwp:
+            return
+        count = 0
+        for binary in self._elf_binaries(self.package_folder):
+            self.run(f'"{dwp}" -e "{binary}" -o "{binary}.dwp"')
+            count += 1
+        self.output.info(f'Split DWARF of {count} binaries packed into .dwp files')
 
 
     def package_info(self):
-        self.boost_python_libs = ['boost::python']
-        self.tbb_libs = ['onetbb::onetbb']
+        if self.options.debug_info_package:
+            # only debug files, for `set debug-file-directory <package>/lib/debug` in gdb
+            self.cpp_info.includedirs = []
+            self.cpp_info.libdirs = []
+            self.cpp_info.bindirs = []
+            return
 
-        self._auto_info()
+        for name, info in self._package_components().items():
+            self.cpp_info.components[name].requires = info.requires
+            self.cpp_info.components[name].libs = info.libs
 
         p_pkg = Path(self.package_folder)
-        self.buildenv_info.prepend_path('PATH', str(p_pkg/'bin'))
-        self.buildenv_info.prepend_path('PYTHONPATH', str(p_pkg/'lib'/'python'))
+        if self._layer_includes('full'):
+            self.buildenv_info.prepend_path('PATH', str(p_pkg/'bin'))
+            if self.options.python:
+                self.buildenv_info.prepend_path('PYTHONPATH', str(p_pkg/'lib'/'python'))
+
+        if self.settings.os == 'Linux':
+            self.cpp_info.components["arch"].system_libs = ['m', 'dl']
+
+        if self.options.monolithic:
+            self._monolithic_info()
+
+
+    def _package_components(self, layer=None):
+        # The components `package_info()` declares for a `package_layer` (the packaged one by default),
+        # as plain objects. `requirements()` also derives the dependencies from them
+        self._set_external_libs()
+        components = {
+            name: info for name, info in self._component_infos().items()
+            if self._component_enabled(name) and self._layer_includes(self._component_layer(name), layer)
+        }
+
+        def plugin(name, requires):
+            if self._layer_includes(self._plugin_layer(name), layer):
+                components[name] = SimpleNamespace(requires=requires, libs=[])
 
         #-------------------------------------------------------------------------------------------
         # PLUGINS These are not found by depproc.py and don't expose any libs, but must be declared
         # as components anyways because conan may complain about unused dependencies
 
-        if self.options.embree:
-            self.cpp_info.components["hdEmbree"].requires = ['plug', 'tf', 'vt', 'gf', 'work', 'hf', 'hd', 'hdx', 'embree3::embree3'] + self.tbb_libs
-            self.cpp_info.components["hdEmbree"].libs = []
+        if self._uses('embree3'):
+            plugin("hdEmbree", ['plug', 'tf', 'vt', 'gf', 'work', 'hf', 'hd', 'hdx', 'embree3::embree3'] + self.tbb_libs)
 
-        if self.options.draco:
-            self.cpp_info.components["usdDraco"].requires = ['tf', 'gf', 'sdf', 'usd', 'usdGeom', 'draco::draco']
-            self.cpp_info.components["usdDraco"].libs = []
-        
-        if self.options.alembic:
-            self.cpp_info.components["usdAbc"].requires = ['tf', 'work', 'sdf', 'usd', 'usdGeom', 'alembic::alembic', 'imath::imath_lib', 'imath::imath_config']
-            self.cpp_info.components["usdAbc"].libs = []
-        
-        if self.options.openvdb:
-            self.cpp_info.components["hioOpenVDB"].requires = ['ar', 'gf', 'hio', 'tf', 'usd', 'imath::imath_lib', 'openvdb::openvdb']
-            self.cpp_info.components["hioOpenVDB"].libs = []
-        
-        if self.options.openimageio:
-            self.cpp_info.components["hioOiio"].requires = ['ar', 'arch', 'gf', 'hio', 'tf', 'openimageio::openimageio', 'imath::imath_lib']
-            self.cpp_info.components["hioOiio"].libs = []
-        
-        if self.options.opencolorio:
-            self.cpp_info.components["hdx"].requires.append('opencolorio::opencolorio')
-        
-        if self.options.ptex:
-            self.cpp_info.components["hdSt"].requires.append('ptex::ptex')
+        if self._uses('draco'):
+            plugin("usdDraco", ['tf', 'gf', 'sdf', 'usd', 'usdGeom', 'draco::draco'])
+
+        if self._uses('alembic'):
+            plugin("usdAbc", ['tf', 'work', 'sdf', 'usd', 'usdGeom', 'alembic::alembic', 'imath::imath_lib', 'imath::imath_config'])
+
+        if self._uses('openvdb'):
+            plugin("hioOpenVDB", ['ar', 'gf', 'hio', 'tf', 'usd', 'imath::imath_lib', 'openvdb::openvdb'])
+
+        if self._uses('openimageio'):
+            plugin("hioOiio", ['ar', 'arch', 'gf', 'hio', 'tf', 'openimageio::openimageio', 'imath::imath_lib'])
+
+        if self._uses('opencolorio') and 'hdx' in components:
+            components["hdx"].requires.append('opencolorio::opencolorio')
+
+        if self._uses('ptex') and 'hdSt' in components:
+            components["hdSt"].requires.append('ptex::ptex')
         #-------------------------------------------------------------------------------------------
 
-        if self.settings.os == 'Linux':
-            self.cpp_info.components["arch"].system_libs = ['m', 'dl']
-            self.cpp_info.components["garch"].requires.append('opengl::opengl')
-            self.cpp_info.components["glf"].requires.append('opengl::opengl')
-    
+        if self.options.allocator == 'tbbmalloc':
+            components["arch"].requires.append('onetbb::tbbmalloc_proxy')
+        elif self.options.allocator == 'jemalloc':
+            components["arch"].requires.append('jemalloc::jemalloc')
 
-    # this method was automatically generated with "depproc.py" and should not be modified directly
-    def _auto_info(self):
+        if self.settings.os == 'Linux' and self.options.imaging:
+            for name in ['garch', 'glf']:
+                if name in components:
+                    components[name].requires.append('opengl::opengl')
+
+        return components
+
+
+    def _required_packages(self, layer=None):
+        # the packages referenced by the components of a `package_layer`
+        return {r.split('::')[0] for info in self._package_components(layer).values() for r in info.requires if '::' in r}
+
+
+    def _monolithic_info(self):
+        # With a monolithic build every library component is linked into libusd_ms. The components
+        # are still declared so that consumers can keep requiring e.g. `openusd::usdGeom`, but they
+        # all just forward to the single library, which carries every external requirement
+        comps = self.cpp_info.components
+        ms = comps["usd_ms"]
+        ms.libs = ['usd_ms']
+        ms.requires = []
+        ms.system_libs = []
+        for name, comp in list(comps.items()):
+            if name == "usd_ms" or not comp.libs:
+                continue
+            for req in comp.requires:
+                if '::' in req and req not in ms.requires:
+                    ms.requires.append(req)
+            for lib in comp.system_libs:
+                if lib not in ms.system_libs:
+                    ms.system_libs.append(lib)
+            comp.requires = ['usd_ms']
+            comp.libs = []
+            comp.system_libs = []
+
+
+    # this method is maintained by hand in the format "depproc.py" generates. Check it against an
+    # install with `./depproc.py /path/to/install --diff`, and replace it with `--write`
+    def _auto_info(self, components):
         # arch
-        self.cpp_info.components["arch"].requires = []
-        self.cpp_info.components["arch"].libs = ['usd_arch']
+        components["arch"].requires = []
+        components["arch"].libs = ['usd_arch']
         # tf
-        self.cpp_info.components["tf"].requires = ['arch'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["tf"].libs = ['usd_tf']
+        components["tf"].requires = ['arch'] + self.boost_python_libs + self.tbb_libs
+        components["tf"].libs = ['usd_tf']
         # gf
-        self.cpp_info.components["gf"].requires = ['arch', 'tf']
-        self.cpp_info.components["gf"].libs = ['usd_gf']
+        components["gf"].requires = ['tf']
+        components["gf"].libs = ['usd_gf']
         # js
-        self.cpp_info.components["js"].requires = ['tf']
-        self.cpp_info.components["js"].libs = ['usd_js']
+        components["js"].requires = ['tf']
+        components["js"].libs = ['usd_js']
         # trace
-        self.cpp_info.components["trace"].requires = ['arch', 'js', 'tf'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["trace"].libs = ['usd_trace']
+        components["trace"].requires = ['js']
+        components["trace"].libs = ['usd_trace']
         # work
-        self.cpp_info.components["work"].requires = ['tf', 'trace'] + self.tbb_libs
-        self.cpp_info.components["work"].libs = ['usd_work']
+        components["work"].requires = ['trace']
+        components["work"].libs = ['usd_work']
         # plug
-        self.cpp_info.components["plug"].requires = ['arch', 'tf', 'js', 'trace', 'work'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["plug"].libs = ['usd_plug']
+        components["plug"].requires = ['work']
+        components["plug"].libs = ['usd_plug']
         # vt
-        self.cpp_info.components["vt"].requires = ['arch', 'tf', 'gf', 'trace'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["vt"].libs = ['usd_vt']
+        components["vt"].requires = ['gf', 'trace']
+        components["vt"].libs = ['usd_vt']
         # ts
-        # skipped
+        components["ts"].requires = ['plug', 'vt']
+        components["ts"].libs = ['usd_ts']
         # ar
-        self.cpp_info.components["ar"].requires = ['arch', 'js', 'tf', 'plug', 'vt'] + self.boost_python_libs
-        self.cpp_info.components["ar"].libs = ['usd_ar']
+        components["ar"].requires = ['plug', 'vt']
+        components["ar"].libs = ['usd_ar']
         # kind
-        self.cpp_info.components["kind"].requires = ['tf', 'plug']
-        self.cpp_info.components["kind"].libs = ['usd_kind']
+        components["kind"].requires = ['plug']
+        components["kind"].libs = ['usd_kind']
         # sdf
-        self.cpp_info.components["sdf"].requires = ['arch', 'tf', 'gf', 'trace', 'vt', 'work', 'ar'] + self.boost_python_libs
-        self.cpp_info.components["sdf"].libs = ['usd_sdf']
+        components["sdf"].requires = ['ar']
+        components["sdf"].libs = ['usd_sdf']
         # ndr
-        self.cpp_info.components["ndr"].requires = ['tf', 'plug', 'vt', 'work', 'ar', 'sdf'] + self.boost_python_libs
-        self.cpp_info.components["ndr"].libs = ['usd_ndr']
+        components["ndr"].requires = ['sdf']
+        components["ndr"].libs = ['usd_ndr']
         # sdr
-        self.cpp_info.components["sdr"].requires = ['tf', 'vt', 'ar', 'ndr', 'sdf'] + self.boost_python_libs
-        self.cpp_info.components["sdr"].libs = ['usd_sdr']
+        components["sdr"].requires = ['ndr']
+        components["sdr"].libs = ['usd_sdr']
         # pcp
-        self.cpp_info.components["pcp"].requires = ['tf', 'trace', 'vt', 'sdf', 'work', 'ar'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["pcp"].libs = ['usd_pcp']
+        components["pcp"].requires = ['sdf']
+        components["pcp"].libs = ['usd_pcp']
         # usd
-        self.cpp_info.components["usd"].requires = ['arch', 'kind', 'pcp', 'sdf', 'ar', 'plug', 'tf', 'trace', 'vt', 'work'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["usd"].libs = ['usd_usd']
+        components["usd"].requires = ['kind', 'pcp']
+        components["usd"].libs = ['usd_usd']
         # usdGeom
-        self.cpp_info.components["usdGeom"].requires = ['js', 'tf', 'plug', 'vt', 'sdf', 'trace', 'usd', 'work'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["usdGeom"].libs = ['usd_usdGeom']
+        components["usdGeom"].requires = ['usd']
+        components["usdGeom"].libs = ['usd_usdGeom']
         # usdVol
-        self.cpp_info.components["usdVol"].requires = ['tf', 'usd', 'usdGeom']
-        self.cpp_info.components["usdVol"].libs = ['usd_usdVol']
+        components["usdVol"].requires = ['usdGeom']
+        components["usdVol"].libs = ['usd_usdVol']
         # usdMedia
-        self.cpp_info.components["usdMedia"].requires = ['tf', 'vt', 'sdf', 'usd', 'usdGeom']
-        self.cpp_info.components["usdMedia"].libs = ['usd_usdMedia']
+        components["usdMedia"].requires = ['usdGeom']
+        components["usdMedia"].libs = ['usd_usdMedia']
         # usdShade
-        self.cpp_info.components["usdShade"].requires = ['tf', 'vt', 'js', 'sdf', 'ndr', 'sdr', 'usd', 'usdGeom']
-        self.cpp_info.components["usdShade"].libs = ['usd_usdShade']
+        components["usdShade"].requires = ['sdr', 'usdGeom']
+        components["usdShade"].libs = ['usd_usdShade']
         # usdLux
-        self.cpp_info.components["usdLux"].requires = ['tf', 'vt', 'ndr', 'sdf', 'usd', 'usdGeom', 'usdShade']
-        self.cpp_info.components["usdLux"].libs = ['usd_usdLux']
+        components["usdLux"].requires = ['usdShade']
+        components["usdLux"].libs = ['usd_usdLux']
         # usdProc
-        self.cpp_info.components["usdProc"].requires = ['tf', 'usd', 'usdGeom']
-        self.cpp_info.components["usdProc"].libs = ['usd_usdProc']
+        components["usdProc"].requires = ['usdGeom']
+        components["usdProc"].libs = ['usd_usdProc']
         # usdRender
-        self.cpp_info.components["usdRender"].requires = ['gf', 'tf', 'usd', 'usdGeom', 'usdShade']
-        self.cpp_info.components["usdRender"].libs = ['usd_usdRender']
+        components["usdRender"].requires = ['usdShade']
+        components["usdRender"].libs = ['usd_usdRender']
         # usdHydra
-        self.cpp_info.components["usdHydra"].requires = ['tf', 'usd', 'usdShade']
-        self.cpp_info.components["usdHydra"].libs = ['usd_usdHydra']
+        components["usdHydra"].requires = ['usdShade']
+        components["usdHydra"].libs = ['usd_usdHydra']
         # usdRi
-        self.cpp_info.components["usdRi"].requires = ['tf', 'vt', 'sdf', 'usd', 'usdShade', 'usdGeom'] + self.boost_python_libs
-        self.cpp_info.components["usdRi"].libs = ['usd_usdRi']
+        components["usdRi"].requires = ['usdShade']
+        components["usdRi"].libs = ['usd_usdRi']
         # usdSkel
-        self.cpp_info.components["usdSkel"].requires = ['arch', 'gf', 'tf', 'trace', 'vt', 'work', 'sdf', 'usd', 'usdGeom'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["usdSkel"].libs = ['usd_usdSkel']
+        components["usdSkel"].requires = ['usdGeom']
+        components["usdSkel"].libs = ['usd_usdSkel']
         # usdUI
-        self.cpp_info.components["usdUI"].requires = ['tf', 'vt', 'sdf', 'usd']
-        self.cpp_info.components["usdUI"].libs = ['usd_usdUI']
+        components["usdUI"].requires = ['usd']
+        components["usdUI"].libs = ['usd_usdUI']
         # usdUtils
-        self.cpp_info.components["usdUtils"].requires = ['arch', 'tf', 'gf', 'sdf', 'usd', 'usdGeom', 'usdShade'] + self.boost_python_libs
-        self.cpp_info.components["usdUtils"].libs = ['usd_usdUtils']
+        components["usdUtils"].requires = ['usdShade']
+        components["usdUtils"].libs = ['usd_usdUtils']
         # usdPhysics
-        self.cpp_info.components["usdPhysics"].requires = ['tf', 'plug', 'vt', 'sdf', 'trace', 'usd', 'usdGeom', 'usdShade', 'work'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["usdPhysics"].libs = ['usd_usdPhysics']
+        components["usdPhysics"].requires = ['usdShade']
+        components["usdPhysics"].libs = ['usd_usdPhysics']
         # usdMtlx
         if self.options.materialx:
-            self.cpp_info.components["usdMtlx"].requires = ['arch', 'gf', 'ndr', 'sdf', 'sdr', 'tf', 'vt', 'usd', 'usdGeom', 'usdShade', 'usdUI', 'usdUtils'] + ['materialx::MaterialXCore', 'materialx::MaterialXFormat']
-            self.cpp_info.components["usdMtlx"].libs = ['usd_usdMtlx']
+            components["usdMtlx"].requires = ['usdUI', 'usdUtils'] + ['materialx::MaterialXCore', 'materialx::MaterialXFormat']
+            components["usdMtlx"].libs = ['usd_usdMtlx']
         else:
-            self.cpp_info.components["usdMtlx"].requires = []
-            self.cpp_info.components["usdMtlx"].libs = []
+            components["usdMtlx"].requires = []
+            components["usdMtlx"].libs = []
         # garch
-        self.cpp_info.components["garch"].requires = ['arch', 'tf']
-        self.cpp_info.components["garch"].libs = ['usd_garch']
+        components["garch"].requires = ['tf']
+        components["garch"].libs = ['usd_garch']
         # hf
-        self.cpp_info.components["hf"].requires = ['plug', 'tf', 'trace']
-        self.cpp_info.components["hf"].libs = ['usd_hf']
+        components["hf"].requires = ['plug']
+        components["hf"].libs = ['usd_hf']
         # hio
-        self.cpp_info.components["hio"].requires = ['arch', 'js', 'plug', 'tf', 'vt', 'trace', 'ar', 'hf']
-        self.cpp_info.components["hio"].libs = ['usd_hio']
+        components["hio"].requires = ['ar', 'hf']
+        components["hio"].libs = ['usd_hio']
         # cameraUtil
-        self.cpp_info.components["cameraUtil"].requires = ['tf', 'gf']
-        self.cpp_info.components["cameraUtil"].libs = ['usd_cameraUtil']
+        components["cameraUtil"].requires = ['gf']
+        components["cameraUtil"].libs = ['usd_cameraUtil']
         # pxOsd
-        self.cpp_info.components["pxOsd"].requires = ['tf', 'gf', 'vt', 'opensubdiv::osdcpu'] + self.boost_python_libs
-        self.cpp_info.components["pxOsd"].libs = ['usd_pxOsd']
+        components["pxOsd"].requires = ['vt', 'opensubdiv::osdcpu']
+        components["pxOsd"].libs = ['usd_pxOsd']
         # geomUtil
-        self.cpp_info.components["geomUtil"].requires = ['arch', 'gf', 'tf', 'vt', 'pxOsd']
-        self.cpp_info.components["geomUtil"].libs = ['usd_geomUtil']
+        components["geomUtil"].requires = ['pxOsd']
+        components["geomUtil"].libs = ['usd_geomUtil']
         # glf
-        self.cpp_info.components["glf"].requires = ['ar', 'arch', 'garch', 'gf', 'hf', 'hio', 'plug', 'tf', 'trace', 'sdf'] + self.boost_python_libs
-        self.cpp_info.components["glf"].libs = ['usd_glf']
+        components["glf"].requires = ['garch', 'hio', 'sdf']
+        components["glf"].libs = ['usd_glf']
         # hgi
-        self.cpp_info.components["hgi"].requires = ['gf', 'plug', 'tf', 'hio']
-        self.cpp_info.components["hgi"].libs = ['usd_hgi']
+        components["hgi"].requires = ['hio']
+        components["hgi"].libs = ['usd_hgi']
         # hgiGL
-        self.cpp_info.components["hgiGL"].requires = ['arch', 'garch', 'hgi', 'tf', 'trace']
-        self.cpp_info.components["hgiGL"].libs = ['usd_hgiGL']
+        components["hgiGL"].requires = ['garch', 'hgi']
+        components["hgiGL"].libs = ['usd_hgiGL']
         # hgiInterop
-        self.cpp_info.components["hgiInterop"].requires = ['gf', 'tf', 'hgi', 'vt', 'garch']
-        self.cpp_info.components["hgiInterop"].libs = ['usd_hgiInterop']
+        components["hgiInterop"].requires = ['hgi', 'garch']
+        components["hgiInterop"].libs = ['usd_hgiInterop']
         # hd
-        self.cpp_info.components["hd"].requires = ['plug', 'tf', 'trace', 'vt', 'work', 'sdf', 'cameraUtil', 'hf', 'pxOsd', 'sdr'] + self.tbb_libs
-        self.cpp_info.components["hd"].libs = ['usd_hd']
+        components["hd"].requires = ['cameraUtil', 'hf', 'pxOsd', 'sdr']
+        components["hd"].libs = ['usd_hd']
         # hdar
-        self.cpp_info.components["hdar"].requires = ['hd', 'ar']
-        self.cpp_info.components["hdar"].libs = ['usd_hdar']
+        components["hdar"].requires = ['hd']
+        components["hdar"].libs = ['usd_hdar']
         # hdGp
-        self.cpp_info.components["hdGp"].requires = ['hd', 'hf'] + self.tbb_libs
-        self.cpp_info.components["hdGp"].libs = ['usd_hdGp']
+        components["hdGp"].requires = ['hd']
+        components["hdGp"].libs = ['usd_hdGp']
         # hdsi
-        self.cpp_info.components["hdsi"].requires = ['plug', 'tf', 'trace', 'vt', 'work', 'sdf', 'cameraUtil', 'geomUtil', 'hf', 'hd', 'pxOsd', 'usdGeom']
-        self.cpp_info.components["hdsi"].libs = ['usd_hdsi']
+        components["hdsi"].requires = ['geomUtil', 'hd', 'usdGeom']
+        components["hdsi"].libs = ['usd_hdsi']
         # hdMtlx
         if self.options.materialx:
-            self.cpp_info.components["hdMtlx"].requires = ['gf', 'hd', 'sdf', 'sdr', 'tf', 'trace', 'usdMtlx', 'vt'] + ['materialx::MaterialXCore', 'materialx::MaterialXFormat']
-            self.cpp_info.components["hdMtlx"].libs = ['usd_hdMtlx']
+            components["hdMtlx"].requires = ['hd', 'usdMtlx'] + ['materialx::MaterialXCore', 'materialx::MaterialXFormat']
+            components["hdMtlx"].libs = ['usd_hdMtlx']
         else:
-            self.cpp_info.components["hdMtlx"].requires = []
-            self.cpp_info.components["hdMtlx"].libs = []
+            components["hdMtlx"].requires = []
+            components["hdMtlx"].libs = []
         # hdSt
-        self.cpp_info.components["hdSt"].requires = ['hio', 'garch', 'glf', 'hd', 'hdsi', 'hgiGL', 'hgiInterop', 'sdr', 'tf', 'trace', 'hdMtlx', 'opensubdiv::osdcpu', 'opensubdiv::osdgpu']
+        components["hdSt"].requires = ['glf', 'hdsi', 'hgiGL', 'hgiInterop', 'hdMtlx', 'opensubdiv::osdgpu']
         if self.options.materialx:
-            self.cpp_info.components["hdSt"].requires += ['materialx::MaterialXGenShader', 'materialx::MaterialXRender', 'materialx::MaterialXCore', 'materialx::MaterialXFormat', 'materialx::MaterialXGenGlsl', 'materialx::MaterialXGenMsl']
-        self.cpp_info.components["hdSt"].libs = ['usd_hdSt']
+            components["hdSt"].requires += ['materialx::MaterialXGenShader', 'materialx::MaterialXRender', 'materialx::MaterialXCore', 'materialx::MaterialXFormat', 'materialx::MaterialXGenGlsl', 'materialx::MaterialXGenMsl']
+        components["hdSt"].libs = ['usd_hdSt']
         # hdx
-        self.cpp_info.components["hdx"].requires = ['plug', 'tf', 'vt', 'gf', 'work', 'garch', 'glf', 'pxOsd', 'hd', 'hdSt', 'hgi', 'hgiInterop', 'cameraUtil', 'sdf']
-        self.cpp_info.components["hdx"].libs = ['usd_hdx']
+        components["hdx"].requires = ['hdSt']
+        components["hdx"].libs = ['usd_hdx']
         # usdImaging
-        self.cpp_info.components["usdImaging"].requires = ['gf', 'tf', 'plug', 'trace', 'vt', 'work', 'geomUtil', 'hd', 'hdar', 'hio', 'pxOsd', 'sdf', 'usd', 'usdGeom', 'usdLux', 'usdRender', 'usdShade', 'usdVol', 'ar'] + self.tbb_libs
-        self.cpp_info.components["usdImaging"].libs = ['usd_usdImaging']
+        components["usdImaging"].requires = ['geomUtil', 'hdar', 'hio', 'usdLux', 'usdRender', 'usdVol']
+        components["usdImaging"].libs = ['usd_usdImaging']
         # usdImagingGL
-        self.cpp_info.components["usdImagingGL"].requires = ['gf', 'tf', 'plug', 'trace', 'vt', 'work', 'hio', 'garch', 'glf', 'hd', 'hdsi', 'hdx', 'pxOsd', 'sdf', 'sdr', 'usd', 'usdGeom', 'usdHydra', 'usdShade', 'usdImaging', 'ar'] + self.boost_python_libs + self.tbb_libs
-        self.cpp_info.components["usdImagingGL"].libs = ['usd_usdImagingGL']
+        components["usdImagingGL"].requires = ['hdx', 'usdHydra', 'usdImaging']
+        components["usdImagingGL"].libs = ['usd_usdImagingGL']
         # usdProcImaging
-        self.cpp_info.components["usdProcImaging"].requires = ['usdImaging', 'usdProc']
-        self.cpp_info.components["usdProcImaging"].libs = ['usd_usdProcImaging']
+        components["usdProcImaging"].requires = ['usdImaging', 'usdProc']
+        components["usdProcImaging"].libs = ['usd_usdProcImaging']
         # usdRiPxrImaging
-        self.cpp_info.components["usdRiPxrImaging"].requires = ['gf', 'tf', 'plug', 'trace', 'vt', 'work', 'hd', 'pxOsd', 'sdf', 'usd', 'usdGeom', 'usdLux', 'usdShade', 'usdImaging', 'usdVol', 'ar'] + self.tbb_libs
-        self.cpp_info.components["usdRiPxrImaging"].libs = ['usd_usdRiPxrImaging']
+        components["usdRiPxrImaging"].requires = ['usdImaging']
+        components["usdRiPxrImaging"].libs = ['usd_usdRiPxrImaging']
         # usdSkelImaging
-        self.cpp_info.components["usdSkelImaging"].requires = ['hio', 'hd', 'usdImaging', 'usdSkel']
-        self.cpp_info.components["usdSkelImaging"].libs = ['usd_usdSkelImaging']
+        components["usdSkelImaging"].requires = ['usdImaging', 'usdSkel']
+        components["usdSkelImaging"].libs = ['usd_usdSkelImaging']
         # usdVolImaging
-        self.cpp_info.components["usdVolImaging"].requires = ['usdImaging']
-        self.cpp_info.components["usdVolImaging"].libs = ['usd_usdVolImaging']
+        components["usdVolImaging"].requires = ['usdImaging']
+        components["usdVolImaging"].libs = ['usd_usdVolImaging']
         # usdAppUtils
-        self.cpp_info.components["usdAppUtils"].requires = ['garch', 'gf', 'hio', 'sdf', 'tf', 'usd', 'usdGeom', 'usdImagingGL'] + self.boost_python_libs
-        self.cpp_info.components["usdAppUtils"].libs = ['usd_usdAppUtils']
+        components["usdAppUtils"].requires = ['usdImagingGL']
+        components["usdAppUtils"].libs = ['usd_usdAppUtils']
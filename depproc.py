@@ -8,13 +8,29 @@
 	Example usage:
 
 	```
-		./depproc.py /path/to/openusd/build
+		./depproc.py /path/to/openusd/install
 	```
 
 	This should be re-run when there's a new openusd version and compared with the existing.
+
+	The generated requires are the transitive reduction of the dependency graph: an edge A -> C is
+	dropped when A already gets C through another dependency B, since conan propagates component
+	requirements transitively. The removed edges are reported on stderr. Pass `--keep-explicit` to
+	keep every edge found in pxrTargets.cmake, or `--keep-explicit=compA,compB` to keep them only
+	for some components.
+
+	Instead of printing the whole method, `--diff` compares the regenerated `_auto_info` with the one
+	currently in conanfile.py and prints only the components and requires that were added or removed,
+	and `--write` replaces the method in conanfile.py. The parsed targets are cached by the content
+	hash of the export files (in ~/.cache/openusd-depproc, or $DEPPROC_CACHE), so re-running against
+	the same export is instant. Pass `--no-cache` to skip the cache.
 """
 
-import sys, json
+import sys, json, re, os, ast, hashlib
+from collections import defaultdict
+from types import SimpleNamespace
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
 
 tab = ' ' * 4
 
@@ -34,6 +50,7 @@ known_libs = [
 	'usd_work',
 	'usd_plug',
 	'usd_vt',
+	'usd_ts',
 	'usd_ar',
 	'usd_kind',
 	'usd_sdf',
@@ -80,6 +97,7 @@ known_libs = [
 	'usd_usdVolImaging',
 	'usd_usdAppUtils',
 	'usd_usdBakeMtlx',
+	'usd_ms', # PXR_BUILD_MONOLITHIC
 ]
 
 def replace_known_reqs(reqstr):
@@ -100,108 +118,470 @@ def replace_known_reqs(reqstr):
 	return reqstr
 
 
-def get_targets(filename):
+#---------------------------------------------------------------------------------------------------
+# CMake export parsing
+
+def tokenize(text):
+	"""
+		Splits CMake code into command invocations, yielding (command, args) with the arguments
+		already unquoted. Handles quoted and bracket arguments, comments, and invocations spanning
+		several lines, which is all that can appear in the files cmake generates for exports.
+	"""
+	i = 0
+	n = len(text)
+
+	def bracket_len(pos):
+		# returns the length of the `[==[` opening at `pos`, or 0
+		j = pos + 1
+		while j < n and text[j] == '=':
+			j += 1
+		return j - pos + 1 if j < n and text[j] == '[' else 0
+
+	def skip_bracket(pos, length):
+		close = ']' + '=' * (length - 2) + ']'
+		end = text.find(close, pos + length)
+		if end < 0:
+			raise ValueError('unterminated bracket argument')
+		return text[pos + length:end], end + len(close)
+
+	while i < n:
+		c = text[i]
+		if c.isspace():
+			i += 1
+		elif c == '#':
+			if text.startswith('[', i + 1) and (length := bracket_len(i + 1)):
+				_, i = skip_bracket(i + 1, length)
+			else:
+				while i < n and text[i] != '\n':
+					i += 1
+		elif c.isalpha() or c == '_':
+			start = i
+			while i < n and (text[i].isalnum() or text[i] == '_'):
+				i += 1
+			command = text[start:i].lower()
+			while i < n and text[i] in ' \t':
+				i += 1
+			if i >= n or text[i] != '(':
+				raise ValueError(f'expected "(" after {command}')
+			args, i = _parse_args(text, i + 1, bracket_len, skip_bracket)
+			yield command, args
+		else:
+			raise ValueError(f'unexpected character {c!r} at offset {i}')
+
+
+def _parse_args(text, i, bracket_len, skip_bracket):
+	args = []
+	n = len(text)
+	depth = 0
+	while i < n:
+		c = text[i]
+		if c.isspace():
+			i += 1
+		elif c == '#':
+			if text.startswith('[', i + 1) and (length := bracket_len(i + 1)):
+				_, i = skip_bracket(i + 1, length)
+			else:
+				while i < n and text[i] != '\n':
+					i += 1
+		elif c == ')':
+			i += 1
+			if depth == 0:
+				return args, i
+			depth -= 1
+			args.append(')')
+		elif c == '(':
+			depth += 1
+			args.append('(')
+			i += 1
+		elif c == '"':
+			i += 1
+			arg = []
+			while i < n and text[i] != '"':
+				if text[i] == '\\' and i + 1 < n:
+					nxt = text[i + 1]
+					if nxt == '\n':
+						pass # line continuation
+					else:
+						arg.append({'n': '\n', 't': '\t', 'r': '\r'}.get(nxt, nxt))
+					i += 2
+				else:
+					arg.append(text[i])
+					i += 1
+			args.append(''.join(arg))
+			i += 1
+		elif c == '[' and (length := bracket_len(i)):
+			arg, i = skip_bracket(i, length)
+			args.append(arg)
+		else:
+			start = i
+			while i < n and not text[i].isspace() and text[i] not in '()"#':
+				i += 2 if text[i] == '\\' else 1
+			args.append(text[start:i].replace('\\', ''))
+	raise ValueError('unterminated command invocation')
+
+
+@dataclass
+class Target:
+	"""
+		An imported target as described by the cmake export files. `locations` and `sonames` map a
+		configuration (uppercase, or '' for the config-less property) to the library file.
+	"""
+	name: str
+	type: str = ''
+	properties: dict = field(default_factory=dict)
+	locations: dict = field(default_factory=dict)
+	sonames: dict = field(default_factory=dict)
+
+	# derived from the properties, see `classify_link_libs`
+	include: list = field(default_factory=list)
+	sys_include: list = field(default_factory=list)
+	link_libs: list = field(default_factory=list)
+	materialx_libs: list = field(default_factory=list)
+	needs_tbb: bool = False
+	needs_boost_python: bool = False
+
+	def location(self, config=None):
+		return _for_config(self.locations, config)
+
+	def soname(self, config=None):
+		return _for_config(self.sonames, config)
+
+
+def _for_config(values, config):
+	if config and config.upper() in values:
+		return values[config.upper()]
+	if '' in values:
+		return values['']
+	# fall back to whatever configuration was exported
+	return next(iter(values.values()), None)
+
+
+def cmake_list(value):
+	return [v for v in value.replace('${_IMPORT_PREFIX}/', '').split(';') if v]
+
+
+def unwrap_genex(item):
+	# static exports wrap private dependencies in `$<LINK_ONLY:...>`. Anything else depends on the
+	# consumer's configuration and can't be expressed in conan
+	if item.startswith('$<LINK_ONLY:') and item.endswith('>'):
+		return item[len('$<LINK_ONLY:'):-1]
+	if '$<' in item:
+		return None
+	return item
+
+
+def classify_link_libs(target):
+	target.link_libs = []
+	target.materialx_libs = []
+	target.needs_tbb = False
+	target.needs_boost_python = False
+	for lib in cmake_list(target.properties.get('INTERFACE_LINK_LIBRARIES', '')):
+		lib = unwrap_genex(lib)
+		if not lib:
+			continue
+		if 'libboost_python' in lib.lower():
+			target.needs_boost_python = True
+		elif 'libtbb' in lib.lower():
+			target.needs_tbb = True
+		elif 'libosd' in lib.lower():
+			if 'libosdCPU' in lib:
+				target.link_libs.append('opensubdiv::osdcpu')
+			elif 'libosdGPU' in lib:
+				target.link_libs.append('opensubdiv::osdgpu')
+			else:
+				assert False, f'Unrecognized libosd library: {lib}'
+		elif 'materialx' in lib.lower():
+			target.materialx_libs.append(replace_known_reqs(lib))
+		else:
+			target.link_libs.append(replace_known_reqs(lib))
+
+
+def apply_command(targets, command, args):
+	if command == 'add_library' and 'IMPORTED' in args:
+		targets[args[0]] = Target(args[0], type=args[1])
+	elif command == 'set_target_properties' and 'PROPERTIES' in args:
+		idx = args.index('PROPERTIES')
+		props = args[idx + 1:]
+		for name in args[:idx]:
+			if name in targets:
+				targets[name].properties.update(zip(props[0::2], props[1::2]))
+	elif command == 'set_property' and len(args) > 1 and args[0] == 'TARGET':
+		idx = args.index('PROPERTY')
+		append = 'APPEND' in args[:idx] or 'APPEND_STRING' in args[:idx]
+		prop, values = args[idx + 1], ';'.join(args[idx + 2:])
+		for name in args[1:idx]:
+			if name in targets:
+				old = targets[name].properties.get(prop, '')
+				targets[name].properties[prop] = f'{old};{values}' if append and old else values
+
+
+def export_files(path):
+	"""
+		Returns the export files to read for `path`, which can be a `pxrTargets.cmake`, or an
+		install/build tree to search for one. The per-configuration files cmake writes next to it
+		(`pxrTargets-release.cmake`, ...) are always included.
+	"""
+	path = Path(path)
+	if path.is_dir():
+		found = sorted(path.rglob('pxrTargets.cmake'), key=lambda p: len(p.parts))
+		if not found:
+			raise FileNotFoundError(f'No pxrTargets.cmake found in {path}')
+		path = found[0]
+	return [path] + sorted(path.parent.glob(f'{path.stem}-*.cmake'))
+
+
+def cache_dir():
+	return Path(os.environ.get('DEPPROC_CACHE', Path.home()/'.cache'/'openusd-depproc'))
+
+
+def get_targets(path, use_cache=True):
+	"""
+		Parses the cmake export files for `path` (see `export_files`) and returns a dict of the
+		pxr targets by name. Targets in `skip_libs` are left out.
+	"""
+	contents = []
+	for filename in export_files(path):
+		with open(filename) as f:
+			contents.append(f.read())
+
+	# the cache key also covers this script, since the result depends on how it parses things
+	digest = hashlib.sha256(Path(__file__).read_bytes())
+	for text in contents:
+		digest.update(text.encode())
+	cache_file = cache_dir()/f'{digest.hexdigest()}.json'
+	if use_cache and cache_file.is_file():
+		with open(cache_file) as f:
+			return {name: Target(**t) for name, t in json.load(f).items()}
+
+	targets = {}
+	for text in contents:
+		for command, args in tokenize(text):
+			apply_command(targets, command, args)
+
 	out = {}
-	with open(filename) as f:
-		cur_target = None
-		_skip = False
-		while l := f.readline():
-			if 'add_library(' in l:
-				cur_target = l.split('add_library(')[1].split(' ')[0]
+	for name, target in targets.items():
+		if name in skip_libs:
+			continue
+		for prop, value in target.properties.items():
+			value = value.replace('${_IMPORT_PREFIX}/', '')
+			if prop.startswith('IMPORTED_LOCATION'):
+				target.locations[prop[len('IMPORTED_LOCATION_'):]] = value
+			elif prop.startswith('IMPORTED_SONAME'):
+				target.sonames[prop[len('IMPORTED_SONAME_'):]] = value
+		target.include = cmake_list(target.properties.get('INTERFACE_INCLUDE_DIRECTORIES', ''))
+		target.sys_include = cmake_list(target.properties.get('INTERFACE_SYSTEM_INCLUDE_DIRECTORIES', ''))
+		classify_link_libs(target)
+		out[name] = target
+
+	if use_cache:
+		cache_file.parent.mkdir(parents=True, exist_ok=True)
+		with open(cache_file, 'w') as f:
+			json.dump({name: asdict(t) for name, t in out.items()}, f)
+	return out
 
-				if cur_target in skip_libs:
-					_skip = True
-					continue
 
-				_skip = False
+# Components whose requires depend on recipe options (see `build_component`), so other components
+# can't rely on them to provide transitive dependencies
+conditional_components = [
+	'usdMtlx',
+	'hdMtlx',
+]
+
+# Pseudo-requirements for the libs that `_auto_info` appends from recipe attributes
+boost_python_req = 'self.boost_python_libs'
+tbb_req = 'self.tbb_libs'
+
+
+def direct_reqs(target):
+	reqs = [r for r in target.link_libs if r]
+	if target.needs_boost_python:
+		reqs.append(boost_python_req)
+	if target.needs_tbb:
+		reqs.append(tbb_req)
+	return reqs
+
+
+def provided_reqs(name, all_targets, cache=None):
+	"""
+		Returns every requirement that component `name` provides to its dependents, i.e. its
+		requirements and (recursively) the requirements of the components it depends on. Doesn't
+		look through conditional components.
+	"""
+	if cache is None:
+		cache = {}
+	if name in cache:
+		return cache[name]
+	out = set()
+	for req in direct_reqs(all_targets[name]):
+		out.add(req)
+		if req in all_targets and req not in conditional_components:
+			out |= provided_reqs(req, all_targets, cache)
+	cache[name] = out
+	return out
 
-				out[cur_target] = {}
 
-			if _skip:
+def reduce_reqs(name, all_targets):
+	"""
+		Returns (kept, removed) for the direct requirements of component `name`, where `removed` is
+		a list of (requirement, provided_by) for the edges that are implied by another requirement.
+	"""
+	reqs = direct_reqs(all_targets[name])
+	cache = {}
+	kept = []
+	removed = []
+	for req in reqs:
+		via = None
+		for other in reqs:
+			if other == req or other not in all_targets or other in conditional_components:
 				continue
+			if req in provided_reqs(other, all_targets, cache):
+				via = other
+				break
+		if via:
+			removed.append((req, via))
+		else:
+			kept.append(req)
+	return kept, removed
 
-			if 'INTERFACE_INCLUDE_DIRECTORIES' in l:
-				sp = l.replace('"','').split('INTERFACE_INCLUDE_DIRECTORIES ')[1]
-				items = [s.replace('\n', '').replace('${_IMPORT_PREFIX}/', '') for s in sp.split(';')]
-				out[cur_target]['include'] = items
-
-			if 'INTERFACE_LINK_LIBRARIES' in l:
-				sp = l.replace('"','').split('INTERFACE_LINK_LIBRARIES ')[1]
-				items = [s.replace('\n', '').replace('${_IMPORT_PREFIX}/', '') for s in sp.split(';')]
-				out[cur_target]['link_libs'] = []
-				out[cur_target]['needs_tbb'] = False
-				out[cur_target]['needs_boost_python'] = False
-				out[cur_target]['materialx_libs'] = []
-				for lib in items:
-					if 'libboost_python' in lib.lower():
-						out[cur_target]['needs_boost_python'] = True
-					elif 'libtbb' in lib.lower():
-						out[cur_target]['needs_tbb'] = True
-					elif 'libosd' in lib.lower():
-						if 'libosdCPU' in lib:
-							out[cur_target]['link_libs'].append('opensubdiv::osdcpu')
-						elif 'libosdGPU' in lib:
-							out[cur_target]['link_libs'].append('opensubdiv::osdgpu')
-						else:
-							assert False, f'Unrecognized libosd library: {lib}'
-					elif 'materialx' in lib.lower():
-						out[cur_target]['materialx_libs'].append(replace_known_reqs(lib))
-					else:
-						out[cur_target]['link_libs'].append(replace_known_reqs(lib))
-			
-			if 'INTERFACE_SYSTEM_INCLUDE_DIRECTORIES' in l:
-				sp = l.replace('"','').split('INTERFACE_SYSTEM_INCLUDE_DIRECTORIES ')[1]
-				items = [s.replace('\n', '').replace('${_IMPORT_PREFIX}/', '') for s in sp.split(';')]
-				out[cur_target]['sys_include'] = items
-	return out
 
+library_file_re = re.compile(r'^(?:lib)?(.+?)\.(?:so|dylib|a|lib|dll)(?:\.[0-9.]+)?$')
 
-def get_libs(name, all_targets):
+def get_libs(name, all_targets, config=None):
 	if '::' in name: return []
+	target = all_targets[name]
+	if location := target.location(config):
+		# use the name of the actual library file when the export has it
+		if m := library_file_re.match(Path(location).name):
+			return [m.group(1)]
+	if name.startswith('usd_'): return [name] # the monolithic library is already named `usd_ms`
 	return [f'usd_{name}']
 
 
-def build_component(name, all_targets):
+def build_component(name, all_targets, reduce=True, removed_edges=None, config=None):
 	out = []
 	target = all_targets[name]
-	inc = target.get('include', []) + target.get('sys_include', [])
-
-	reqs = []
-	libs = get_libs(name, all_targets)
-	for req in target['link_libs']:
-		if req:
-			reqs.append(req)
+	inc = target.include + target.sys_include
 
+	libs = get_libs(name, all_targets, config)
 	for l in libs:
 		assert l in known_libs, f"Uknown lib: {l}"
 
+	if reduce:
+		all_reqs, removed = reduce_reqs(name, all_targets)
+		if removed_edges is not None:
+			removed_edges += [(name, req, via) for req, via in removed]
+	else:
+		all_reqs = direct_reqs(target)
+
+	reqs = [r for r in all_reqs if r not in (boost_python_req, tbb_req)]
 	reqstr = str(reqs)
-	if target['needs_boost_python']:
-		reqstr += ' + self.boost_python_libs'
-	if target['needs_tbb']:
-		reqstr += ' + self.tbb_libs'
+	if boost_python_req in all_reqs:
+		reqstr += f' + {boost_python_req}'
+	if tbb_req in all_reqs:
+		reqstr += f' + {tbb_req}'
 
 	if name in ['usdMtlx', 'hdMtlx']:
 		# make sure to only include these components if the materialx option is true
-		reqstr += ' + %s' % (target['materialx_libs'])
+		reqstr += ' + %s' % (target.materialx_libs)
 		out.append(f"if self.options.materialx:")
-		out.append(f"{tab}self.cpp_info.components[\"{name}\"].requires = {reqstr}")
-		out.append(f"{tab}self.cpp_info.components[\"{name}\"].libs = {libs}")
+		out.append(f"{tab}components[\"{name}\"].requires = {reqstr}")
+		out.append(f"{tab}components[\"{name}\"].libs = {libs}")
 		out.append(f"else:")
-		out.append(f"{tab}self.cpp_info.components[\"{name}\"].requires = []")
-		out.append(f"{tab}self.cpp_info.components[\"{name}\"].libs = []")
+		out.append(f"{tab}components[\"{name}\"].requires = []")
+		out.append(f"{tab}components[\"{name}\"].libs = []")
 	else:	
-		out.append(f"self.cpp_info.components[\"{name}\"].requires = {reqstr}")
-		if mxlibs := target['materialx_libs']:
+		out.append(f"components[\"{name}\"].requires = {reqstr}")
+		if mxlibs := target.materialx_libs:
 			out.append(f"if self.options.materialx:")
-			out.append(f"{tab}self.cpp_info.components[\"{name}\"].requires += {mxlibs}")
-		out.append(f"self.cpp_info.components[\"{name}\"].libs = {libs}")
+			out.append(f"{tab}components[\"{name}\"].requires += {mxlibs}")
+		out.append(f"components[\"{name}\"].libs = {libs}")
+	return out
+
+
+def generate_auto_info(targets, keep_explicit=None, config=None, removed_edges=None):
+	"""
+		Returns the source lines of the `_auto_info` method. `keep_explicit` is a list of components
+		that keep all of their explicit edges, or True for all of them.
+	"""
+	out = [f'{tab}def _auto_info(self, components):']
+	for target in targets:
+		out.append(f'{tab}{tab}# {target}')
+		reduce = keep_explicit is not True and target not in (keep_explicit or [])
+		try:
+			out += [f'{tab}{tab}{line}' for line in build_component(target, targets, reduce, removed_edges, config)]
+		except AssertionError as e:
+			print(f'skipped {target}: {e}', file=sys.stderr)
+			out.append(f'{tab}{tab}# skipped')
+	return out
+
+
+auto_info_header = f'{tab}def _auto_info(self, components):'
+
+def find_auto_info(source):
+	"""
+		Returns the (start, end) line indices of the `_auto_info` method in the conanfile source
+	"""
+	lines = source.split('\n')
+	start = lines.index(auto_info_header)
+	end = start + 1
+	while end < len(lines) and (not lines[end].strip() or lines[end].startswith(tab * 2)):
+		end += 1
+	# don't swallow the blank lines before whatever follows the method
+	while end > start + 1 and not lines[end - 1].strip():
+		end -= 1
+	return start, end
+
+
+def eval_auto_info(lines, materialx=True):
+	"""
+		Runs the given `_auto_info` source against plain objects and returns {component: (requires,
+		libs)}, with the recipe attributes it references replaced by placeholders.
+	"""
+	code = '\n'.join(l[len(tab):] for l in lines)
+	namespace = {}
+	exec(compile(ast.parse(code), '<_auto_info>', 'exec'), namespace)
+	fake_self = SimpleNamespace(
+		options=SimpleNamespace(materialx=materialx),
+		boost_python_libs=[boost_python_req],
+		tbb_libs=[tbb_req],
+	)
+	components = defaultdict(lambda: SimpleNamespace(requires=[], libs=[]))
+	namespace['_auto_info'](fake_self, components)
+	return {name: (set(c.requires), list(c.libs)) for name, c in components.items()}
+
+
+def diff_auto_info(old_lines, new_lines):
+	"""
+		Returns a list of human-readable differences between two versions of `_auto_info`, for both
+		values of the materialx option.
+	"""
+	out = []
+	for materialx in (True, False):
+		old = eval_auto_info(old_lines, materialx)
+		new = eval_auto_info(new_lines, materialx)
+		diff = []
+		for name in sorted(new.keys() - old.keys()):
+			diff.append(f'+ component {name}: requires {sorted(new[name][0])}, libs {new[name][1]}')
+		for name in sorted(old.keys() - new.keys()):
+			diff.append(f'- component {name}')
+		for name in [n for n in new if n in old]:
+			for req in sorted(new[name][0] - old[name][0]):
+				diff.append(f'  {name}: + requires {req}')
+			for req in sorted(old[name][0] - new[name][0]):
+				diff.append(f'  {name}: - requires {req}')
+			if new[name][1] != old[name][1]:
+				diff.append(f'  {name}: libs {old[name][1]} -> {new[name][1]}')
+		for line in diff:
+			if line not in out:
+				out.append(line if materialx else f'{line} (materialx=False)')
 	return out
 
 
 def print_usage():
-	print(f"USAGE:\n\t{sys.argv[0]} </path/to/pxrTargets.cmake> [-v]\n")
-	print("pxrTarget.cmake can be found in the 'cmake' install folder after performing a standard build and install.\n")
+	print(f"USAGE:\n\t{sys.argv[0]} </path/to/pxrTargets.cmake|/path/to/install> [-v] [--config=Release] [--keep-explicit[=comp,...]] [--diff] [--write] [--conanfile=path] [--no-cache]\n")
+	print("pxrTarget.cmake can be found in the 'cmake' install folder after performing a standard build and install.")
+	print("The per-configuration files next to it (pxrTargets-release.cmake, ...) are read as well. If a")
+	print("folder is given, the first pxrTargets.cmake found in it is used.\n")
 	print("On Linux, you can use this command to find it:\n\tfind /path/to/openusd -name \"pxrTargets.cmake\"")
 
 
@@ -210,15 +590,52 @@ if __name__ == '__main__':
 		print_usage()
 		sys.exit(1)
 
-	targets = get_targets(sys.argv[1])
-	
-	if len(sys.argv) == 3 and '-v' in sys.argv:
-		print(json.dumps(targets, indent=2))
-
-	print(f'{tab}def _auto_info(self):')
-	for target in targets:
-		print(f'{tab}{tab}#', target)
-		try:
-			print(f'{tab}{tab}' + f'\n{tab}{tab}'.join(build_component(target, targets)))
-		except AssertionError as e:
-			print(f'{tab}{tab}# skipped')
\ No newline at end of file
+	args = sys.argv[2:]
+	def arg_value(name, default=None):
+		for arg in args:
+			if arg.startswith(f'{name}='):
+				return arg.split('=', 1)[1]
+		return default
+
+	# configuration to take the library files from, when the export has several
+	config = arg_value('--config')
+
+	# components that keep all of their explicit edges. None means none of them, True means all
+	keep_explicit = True if '--keep-explicit' in args else None
+	if value := arg_value('--keep-explicit'):
+		keep_explicit = value.split(',')
+
+	targets = get_targets(sys.argv[1], use_cache='--no-cache' not in args)
+
+	# `self.boost_python_libs` is empty with python=False, so `_auto_info` has to come from an install
+	# with the python bindings to be right for both
+	if not any(t.needs_boost_python for t in targets.values()):
+		print('Warning: no library links boost::python, the install seems to be built without python. The', file=sys.stderr)
+		print('generated _auto_info will lack the boost::python requirements needed with python=True', file=sys.stderr)
+
+	if '-v' in args:
+		print(json.dumps({name: asdict(t) for name, t in targets.items()}, indent=2))
+
+	removed_edges = []
+	new_lines = generate_auto_info(targets, keep_explicit, config, removed_edges)
+
+	if '--diff' in args or '--write' in args:
+		conanfile = Path(arg_value('--conanfile', Path(__file__).parent/'conanfile.py'))
+		source = conanfile.read_text()
+		lines = source.split('\n')
+		start, end = find_auto_info(source)
+		diff = diff_auto_info(lines[start:end], new_lines)
+		if diff:
+			print('\n'.join(diff))
+		else:
+			print('_auto_info is up to date')
+		if '--write' in args and diff:
+			conanfile.write_text('\n'.join(lines[:start] + new_lines + lines[end:]))
+			print(f'Updated {conanfile}')
+	else:
+		print('\n'.join(new_lines))
+
+	if removed_edges:
+		print(f'\nRemoved {len(removed_edges)} redundant edges:', file=sys.stderr)
+		for name, req, via in removed_edges:
+			print(f'\t{name} -> {req} (provided by {via})', file=sys.stderr)
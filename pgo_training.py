@@ -0,0 +1,174 @@
+#! /usr/bin/env python
+
+"""
+	Training workload for the profile-guided optimization build of the recipe (`pgo=True`). It
+	generates synthetic stages locally (no assets are downloaded or shipped) and exercises the code
+	paths that dominate real pipelines: composition (pcp), value resolution (usd/sdf), crate and usda
+	parsing/writing, flattening, and the command-line tools.
+
+	It needs the `pxr` python bindings of the build being trained on PYTHONPATH, and its `bin` folder
+	on PATH for the tools. The recipe takes care of that, but it can also be run by hand:
+
+	```
+		./pgo_training.py /path/to/workdir [--scale=N]
+	```
+"""
+
+import sys, subprocess, shutil
+from pathlib import Path
+
+
+def make_stages(workdir, prims=500, layers=4, variants=4, refs=2, time_samples=24):
+	"""
+		Writes a set of synthetic stages to `workdir` and returns {name: path} for the stages meant to
+		be opened. `prims` is the number of prims in the root layer, `layers` the depth of the sublayer
+		stack, `variants` the number of variants per variant set and `refs` the number of references
+		each prim has to the shared asset. Every layer is written both as .usda and .usdc.
+	"""
+	from pxr import Sdf, Usd, UsdGeom, Vt, Gf
+
+	workdir = Path(workdir)
+	workdir.mkdir(parents=True, exist_ok=True)
+
+	# a shared asset that every prim references, with some geometry and animated attributes
+	asset = Usd.Stage.CreateInMemory()
+	root = UsdGeom.Xform.Define(asset, '/Asset')
+	asset.SetDefaultPrim(root.GetPrim())
+	for i in range(8):
+		mesh = UsdGeom.Mesh.Define(asset, f'/Asset/geo_{i}')
+		mesh.CreatePointsAttr(Vt.Vec3fArray([Gf.Vec3f(x, i, x * 0.5) for x in range(64)]))
+		mesh.CreateFaceVertexCountsAttr(Vt.IntArray([4] * 16))
+		mesh.CreateFaceVertexIndicesAttr(Vt.IntArray([j % 64 for j in range(64)]))
+		xf = UsdGeom.Xformable(mesh).AddTranslateOp()
+		for t in range(time_samples):
+			xf.Set(Gf.Vec3d(t, i, 0), Usd.TimeCode(t))
+	asset.GetRootLayer().Export(str(workdir/'asset.usda'))
+	asset.GetRootLayer().Export(str(workdir/'asset.usdc'))
+
+	out = {}
+	for ext in ['usda', 'usdc']:
+		# sublayer stack, each overriding a slice of the prims
+		sublayers = []
+		for depth in range(layers):
+			layer = Sdf.Layer.CreateNew(str(workdir/f'layer_{depth}.{ext}'))
+			for p in range(depth, prims, layers):
+				spec = Sdf.CreatePrimInLayer(layer, f'/World/prim_{p}')
+				spec.specifier = Sdf.SpecifierOver
+				attr = Sdf.AttributeSpec(spec, 'weight', Sdf.ValueTypeNames.Double)
+				attr.default = float(depth)
+			if sublayers:
+				layer.subLayerPaths.append(sublayers[-1].identifier)
+			layer.Save()
+			sublayers.append(layer)
+
+		stage = Usd.Stage.CreateNew(str(workdir/f'root.{ext}'))
+		if sublayers:
+			stage.GetRootLayer().subLayerPaths.append(sublayers[-1].identifier)
+		world = UsdGeom.Xform.Define(stage, '/World')
+		stage.SetDefaultPrim(world.GetPrim())
+		stage.SetStartTimeCode(0)
+		stage.SetEndTimeCode(time_samples - 1)
+		for p in range(prims):
+			prim = stage.DefinePrim(f'/World/prim_{p}', 'Xform')
+			for r in range(refs):
+				prim.GetReferences().AddReference(f'./asset.{ext}')
+			vset = prim.GetVariantSets().AddVariantSet('look')
+			for v in range(variants):
+				vset.AddVariant(f'v{v}')
+				vset.SetVariantSelection(f'v{v}')
+				with vset.GetVariantEditContext():
+					prim.CreateAttribute('variantValue', Sdf.ValueTypeNames.Int).Set(v)
+			vset.SetVariantSelection(f'v{p % max(variants, 1)}')
+			prim.CreateAttribute('weight', Sdf.ValueTypeNames.Double).Set(float(p))
+		stage.GetRootLayer().Save()
+		out[ext] = workdir/f'root.{ext}'
+	return out
+
+
+def traverse(stage, times):
+	"""
+		Walks every prim of the stage and resolves all of its attributes at the given times. Returns
+		the number of values resolved.
+	"""
+	from pxr import Usd
+	count = 0
+	for prim in Usd.PrimRange(stage.GetPseudoRoot()):
+		for attr in prim.GetAttributes():
+			for t in times:
+				attr.Get(Usd.TimeCode(t))
+				count += 1
+	return count
+
+
+def run_workload(stages, workdir, repeat=1):
+	from pxr import Usd, UsdGeom, UsdUtils, Sdf
+
+	workdir = Path(workdir)
+	for _ in range(repeat):
+		for ext, path in stages.items():
+			stage = Usd.Stage.Open(str(path))
+			traverse(stage, range(0, 24, 6))
+
+			cache = UsdGeom.XformCache(Usd.TimeCode(3))
+			for prim in stage.Traverse():
+				cache.GetLocalToWorldTransform(prim)
+
+			# variant switching forces recomposition
+			for prim in list(stage.GetPseudoRoot().GetChildren()[0].GetChildren())[:50]:
+				vset = prim.GetVariantSet('look')
+				names = vset.GetVariantNames()
+				if names:
+					vset.SetVariantSelection(names[-1])
+
+			UsdUtils.FlattenLayerStack(stage)
+			stage.Flatten().Export(str(workdir/f'flat.{ext}'))
+			stage.GetRootLayer().ExportToString()
+			Sdf.Layer.FindOrOpen(str(workdir/f'flat.{ext}')).Reload(force=True)
+
+
+def run_tools(stages, workdir):
+	"""
+		Runs the packaged command-line tools over the stages, skipping the ones that weren't built
+	"""
+	workdir = Path(workdir)
+	commands = []
+	for ext, path in stages.items():
+		commands += [
+			['usdcat', str(path), '-o', str(workdir/f'cat.{"usdc" if ext == "usda" else "usda"}')],
+			['usdcat', '--flatten', str(path), '-o', str(workdir/f'catflat.{ext}')],
+			['usdtree', '-a', str(path)],
+			['usdresolve', f'./asset.{ext}', '--anchorPath', str(path)],
+			['sdfdump', '-s', str(path)],
+		]
+	for cmd in commands:
+		exe = shutil.which(cmd[0])
+		if not exe:
+			print(f'{cmd[0]} not found, skipping', file=sys.stderr)
+			continue
+		# the python tools are scripts, run them with this interpreter
+		with open(exe, 'rb') as f:
+			is_script = f.read(2) == b'#!'
+		full = ([sys.executable, exe] if is_script else [exe]) + cmd[1:]
+		subprocess.run(full, check=True, stdout=subprocess.DEVNULL)
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} </path/to/workdir> [--scale=N]\n")
+	print("The pxr python bindings must be on PYTHONPATH, and the usd tools on PATH.")
+
+
+if __name__ == '__main__':
+	if not len(sys.argv) >= 2:
+		print_usage()
+		sys.exit(1)
+
+	scale = 1
+	for arg in sys.argv[2:]:
+		if arg.startswith('--scale='):
+			scale = int(arg.split('=', 1)[1])
+
+	workdir = Path(sys.argv[1])
+	stages = make_stages(workdir, prims=500 * scale, layers=4, variants=4, refs=2)
+	run_workload(stages, workdir, repeat=2)
+	run_tools(stages, workdir)
+	print(f'Training workload done in {workdir}')
@@ -0,0 +1,137 @@
+#! /usr/bin/env python
+
+"""
+	Merges the plugInfo.json files of an openusd install into a single plugin index. At startup,
+	`plug` reads `lib/usd/plugInfo.json` and `plugin/usd/plugInfo.json`, whose `Includes` wildcards
+	(`*/resources/`) make it list those folders and open one file per plugin, which is slow on network
+	filesystems. The index has every plugin of both trees, with its `Root`, `LibraryPath` and
+	`ResourcePath` resolved relative to the index itself (so the install stays relocatable), and replaces
+	`lib/usd/plugInfo.json`. `plugin/usd/plugInfo.json` is emptied since its plugins are in the index.
+
+	It's run by the recipe's `package()`, but can also be used on its own:
+
+	```
+		./pluginindex.py /path/to/openusd/install [--dry-run]
+	```
+"""
+
+import sys, os, json, glob
+from pathlib import Path
+
+# the plugInfo.json files plug reads from the install without any environment
+entry_points = [Path('lib')/'usd'/'plugInfo.json', Path('plugin')/'usd'/'plugInfo.json']
+
+
+def read_plug_info(path):
+	"""
+		Reads a plugInfo.json, which plug allows to have `#` comment lines
+	"""
+	with open(path) as f:
+		text = ''.join(line for line in f if not line.lstrip().startswith('#'))
+	return json.loads(text) if text.strip() else {}
+
+
+def collect_plugins(path, seen=None):
+	"""
+		Returns the plugins declared by the plugInfo.json at `path` and everything it includes, as
+		(declaration, root, library, resources) with the last three as absolute paths (library is None
+		for plugins without one). Every file is read once, like plug does.
+	"""
+	if seen is None:
+		seen = set()
+	path = Path(os.path.normpath(os.path.abspath(path)))
+	if path in seen or not path.is_file():
+		return []
+	seen.add(path)
+
+	info = read_plug_info(path)
+	out = []
+	for pattern in info.get('Includes', []):
+		if pattern.endswith('/'):
+			pattern += 'plugInfo.json'
+		for match in sorted(glob.glob(str(path.parent/pattern))):
+			if os.path.isdir(match):
+				match = os.path.join(match, 'plugInfo.json')
+			out += collect_plugins(match, seen)
+
+	for plugin in info.get('Plugins', []):
+		root = Path(os.path.normpath(path.parent/plugin.get('Root', '.')))
+		library = plugin.get('LibraryPath')
+		library = Path(os.path.normpath(root/library)) if library else None
+		resources = Path(os.path.normpath(root/plugin.get('ResourcePath', '.')))
+		out.append((plugin, root, library, resources))
+	return out
+
+
+def make_index(plugins, index_dir):
+	"""
+		Builds the merged plugInfo.json contents for `plugins` (as returned by `collect_plugins`), with
+		paths relative to `index_dir`. Returns (index, problems)
+	"""
+	index = []
+	problems = []
+	names = set()
+	for plugin, root, library, resources in plugins:
+		name = plugin.get('Name')
+		if name in names:
+			problems.append(f'plugin {name} is declared more than once, keeping the first one')
+			continue
+		names.add(name)
+		if library and not library.exists():
+			problems.append(f'plugin {name}: library {library} does not exist')
+
+		entry = dict(plugin)
+		entry['Root'] = Path(os.path.relpath(root, index_dir)).as_posix()
+		entry['ResourcePath'] = Path(os.path.relpath(resources, root)).as_posix()
+		if library:
+			entry['LibraryPath'] = Path(os.path.relpath(library, root)).as_posix()
+		index.append(entry)
+	return {'Plugins': index}, problems
+
+
+def replace_file(path, text):
+	# the recipe hardlinks the install into the package, so files are replaced rather than rewritten
+	tmp = path.with_name(path.name + '.tmp')
+	tmp.write_text(text)
+	os.replace(tmp, path)
+
+
+def write_index(install_dir, dry_run=False):
+	"""
+		Replaces the install's plugin entry points with the merged index. Returns (number of plugins,
+		problems found)
+	"""
+	install_dir = Path(install_dir)
+	entries = [install_dir/e for e in entry_points if (install_dir/e).is_file()]
+	if not entries:
+		# builds without plug (see the recipe's `components` option) have no plugins
+		return 0, []
+
+	seen = set()
+	plugins = []
+	for entry in entries:
+		plugins += collect_plugins(entry, seen)
+
+	index_path = entries[0]
+	index, problems = make_index(plugins, index_path.parent)
+	if not dry_run:
+		header = '# plugin index generated by pluginindex.py from the plugInfo.json files of this install\n'
+		replace_file(index_path, header + json.dumps(index, indent=4) + '\n')
+		for entry in entries[1:]:
+			replace_file(entry, '# merged into ' + os.path.relpath(index_path, entry.parent) + '\n' + json.dumps({'Plugins': []}) + '\n')
+	return len(index['Plugins']), problems
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} </path/to/openusd/install> [--dry-run]\n")
+
+
+if __name__ == '__main__':
+	if not len(sys.argv) >= 2:
+		print_usage()
+		sys.exit(1)
+
+	count, problems = write_index(sys.argv[1], dry_run='--dry-run' in sys.argv[2:])
+	for problem in problems:
+		print(f'Warning: {problem}', file=sys.stderr)
+	print(f'{count} plugins indexed')
@@ -0,0 +1,170 @@
+#! /usr/bin/env python
+
+"""
+	Checks that the recipe's `reproducible` option gives byte-identical packages. The package is built
+	twice from source with `conan install --build=openusd/*`. Conan builds each time in a new, randomly
+	named build folder (and with `--conan-home`, the second build also uses another cache, so the
+	source and dependency folders differ too). Both package folders are copied aside and compared
+	file by file.
+
+	```
+		./reprocheck.py [--options=opt=value,...] [--profile=name] [--conan-arg=ARG ...]
+			[--conan-home=path] [--workdir=path] [--out=report.json]
+	```
+
+	Options without a package pattern apply to openusd, as in `abbench.py`. The report lists the
+	files that only exist in one of the packages, the ones whose contents differ, and the files of
+	either package that still contain the absolute path of the conan cache they were built in. The
+	exit status is 0 only when the packages are identical. `diffoscope`, when it's installed, shows
+	what differs inside a file:
+
+	```
+		diffoscope reprocheck/a/lib/libusd_tf.so reprocheck/b/lib/libusd_tf.so
+	```
+"""
+
+import sys, os, json, shutil, hashlib, subprocess, shlex
+from pathlib import Path
+
+from abbench import recipe_dir, parse_variant, recipe_version
+
+
+def conan(args, home=None, capture=False):
+	env = dict(os.environ, CONAN_HOME=home) if home else None
+	print(shlex.join(['conan'] + args), file=sys.stderr)
+	proc = subprocess.run(['conan'] + args, env=env, check=True, stdout=subprocess.PIPE if capture else None, text=True)
+	return proc.stdout
+
+
+def build_package(version, option_args, extra_args, home):
+	"""
+		Builds the package from source and returns its folder in the cache
+	"""
+	conan(['export', str(recipe_dir), f'--version={version}'], home)
+	out = conan([
+		'install', f'--requires=openusd/{version}', '--build=missing', '--build=openusd/*',
+		'-o', 'openusd/*:reproducible=True', '--format=json',
+	] + option_args + extra_args, home, capture=True)
+	for node in json.loads(out)['graph']['nodes'].values():
+		if node['ref'].startswith('openusd/'):
+			return Path(node['package_folder'])
+	raise RuntimeError('openusd is not in the installed graph')
+
+
+def file_digest(path):
+	h = hashlib.sha256()
+	with open(path, 'rb') as f:
+		for chunk in iter(lambda: f.read(1 << 20), b''):
+			h.update(chunk)
+	return h.hexdigest()
+
+
+# has the time of packaging, and otherwise only the checksums of the files, which are compared directly
+ignored_files = ['conanmanifest.txt']
+
+
+def tree_digests(root):
+	"""
+		{relative path: sha256, or `-> target` for symlinks}
+	"""
+	digests = {}
+	for path in sorted(Path(root).rglob('*')):
+		rel = path.relative_to(root).as_posix()
+		if rel in ignored_files:
+			continue
+		if path.is_symlink():
+			digests[rel] = '-> ' + os.readlink(path)
+		elif path.is_file():
+			digests[rel] = file_digest(path)
+	return digests
+
+
+def find_leaks(root, marker):
+	"""
+		Files under `root` that contain the bytes of `marker` (an absolute path)
+	"""
+	needle = marker.encode()
+	leaks = []
+	for path in sorted(Path(root).rglob('*')):
+		if path.is_file() and not path.is_symlink() and needle in path.read_bytes():
+			leaks.append(path.relative_to(root).as_posix())
+	return leaks
+
+
+def compare(a, b):
+	da, db = tree_digests(a), tree_digests(b)
+	return {
+		'only_in_a': sorted(set(da) - set(db)),
+		'only_in_b': sorted(set(db) - set(da)),
+		'different': sorted(p for p in set(da) & set(db) if da[p] != db[p]),
+		'identical': sum(1 for p in set(da) & set(db) if da[p] == db[p]),
+	}
+
+
+def conan_home(home=None):
+	return conan(['config', 'home'], home, capture=True).strip()
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} [--options=opt=value,...] [--profile=name] [--conan-arg=ARG ...] [--conan-home=path] [--workdir=path] [--out=report.json]\n")
+	print("Builds the package twice with reproducible=True and compares the results.")
+
+
+if __name__ == '__main__':
+	option_args = []
+	extra_args = []
+	second_home = None
+	workdir = Path('reprocheck')
+	out = None
+	for arg in sys.argv[1:]:
+		if arg.startswith('--options='):
+			option_args += parse_variant(':' + arg.split('=', 1)[1])[1]
+		elif arg.startswith('--profile='):
+			extra_args += ['-pr', arg.split('=', 1)[1]]
+		elif arg.startswith('--conan-arg='):
+			extra_args.append(arg.split('=', 1)[1])
+		elif arg.startswith('--conan-home='):
+			second_home = str(Path(arg.split('=', 1)[1]).resolve())
+		elif arg.startswith('--workdir='):
+			workdir = Path(arg.split('=', 1)[1])
+		elif arg.startswith('--out='):
+			out = arg.split('=', 1)[1]
+		else:
+			print(f'Unknown argument: {arg}')
+			print_usage()
+			sys.exit(1)
+
+	workdir = workdir.resolve()
+	version = recipe_version()
+	homes = {'a': None, 'b': second_home}
+	leaks = {}
+	for name, home in homes.items():
+		package = build_package(version, option_args, extra_args, home)
+		# the second build replaces the package in the cache, so keep a copy of each
+		copy = workdir/name
+		if copy.exists():
+			shutil.rmtree(copy)
+		shutil.copytree(package, copy, symlinks=True)
+		leaks[name] = find_leaks(copy, conan_home(home))
+
+	report = compare(workdir/'a', workdir/'b')
+	report['leaks'] = leaks
+	report['options'] = option_args
+
+	print(f"{report['identical']} identical files")
+	for key in ['only_in_a', 'only_in_b', 'different']:
+		for path in report[key]:
+			print(f'{key}: {path}')
+	for name, paths in leaks.items():
+		for path in paths:
+			print(f'cache path in {name}/{path}')
+	if report['different'] and shutil.which('diffoscope'):
+		print(f"Inspect with: diffoscope {workdir/'a'/report['different'][0]} {workdir/'b'/report['different'][0]}")
+
+	if out:
+		with open(out, 'w') as f:
+			json.dump(report, f, indent=2)
+
+	reproducible = not (report['only_in_a'] or report['only_in_b'] or report['different'])
+	print('The packages are identical' if reproducible else 'The packages differ')
+	sys.exit(0 if reproducible else 1)
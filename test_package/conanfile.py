@@ -0,0 +1,96 @@
+import os
+from pathlib import Path
+from conan import ConanFile
+from conan.tools.build import can_run
+from conan.tools.cmake import CMake, CMakeToolchain
+from conan.tools.env import Environment
+from conan.tools.files import copy
+
+
+class OpenUSDTestPackage(ConanFile):
+    settings = 'os', 'compiler', 'arch', 'build_type'
+    generators = 'CMakeDeps', 'VirtualBuildEnv', 'VirtualRunEnv'
+    test_type = 'explicit'
+
+    def requirements(self):
+        self.requires(self.tested_reference_str)
+
+
+    def layout(self):
+        self.folders.build = 'build'
+        self.folders.generators = os.path.join('build', 'generators')
+
+
+    # the components the C++ consumer can be built against, from the most to the least complete
+    _consumer_components = ['usdGeom', 'usd', 'sdf']
+
+    def _consumer_component(self):
+        # a `components` subset of the package may not have usdGeom, or even usd
+        components = self.dependencies['openusd'].cpp_info.components
+        return next((name for name in self._consumer_components if name in components), None)
+
+
+    def generate(self):
+        tc = CMakeToolchain(self)
+        tc.cache_variables['OPENUSD_COMPONENT'] = self._consumer_component() or ''
+        tc.generate()
+
+        # the benchmark generates its stages with the PGO workload's `make_stages`, which is exported
+        # with the tested recipe
+        copy(self, 'pgo_training.py', self.dependencies['openusd'].recipe_folder, self.generators_folder)
+        env = Environment()
+        env.prepend_path('PYTHONPATH', self.generators_folder)
+        env.vars(self, scope='run').save_script('conanbenchmark')
+
+
+    def build(self):
+        if not self._consumer_component():
+            return
+        cmake = CMake(self)
+        cmake.configure()
+        cmake.build()
+
+
+    # options of the tested package that affect performance, recorded with the results
+    _tracked_options = ['shared', 'python', 'monolithic', 'safety_over_speed', 'lto', 'pgo', 'hidden_visibility', 'fast_startup', 'allocator']
+
+    def test(self):
+        if not can_run(self):
+            return
+        # the C++ consumer uses the most complete of usdGeom, usd or sdf that the package has
+        if component := self._consumer_component():
+            self.output.info(f'Running the C++ consumer against openusd::{component}')
+            # multi-config generators put the executable in a folder named after the build type
+            name = 'test_package.exe' if self.settings.os == 'Windows' else 'test_package'
+            candidates = [Path(self.build_folder)/name, Path(self.build_folder)/str(self.settings.build_type)/name]
+            executable = next((path for path in candidates if path.is_file()), candidates[0])
+            self.run(f'"{executable}"', env='conanrun')
+        else:
+            self.output.info('openusd has none of usdGeom, usd or sdf, skipping the C++ consumer')
+
+        dep = self.dependencies['openusd']
+        if not dep.options.python:
+            self.output.info('openusd was built with python=False, skipping the benchmark (it uses the python bindings)')
+            return
+        if dep.options.get_safe('package_layer', 'full') != 'full':
+            self.output.info(f'openusd only packages the {dep.options.package_layer} layer, skipping the benchmark (it uses the python bindings)')
+            return
+        # the benchmark size and output can be changed from the profile/command line, e.g.
+        # `-c user.openusd:benchmark_size=large -c user.openusd:benchmark_out=/tmp/results.json`
+        size = self.conf.get('user.openusd:benchmark_size', default='small', check_type=str)
+        out = self.conf.get('user.openusd:benchmark_out', default=str(Path(self.build_folder)/'benchmark.json'), check_type=str)
+        script = Path(self.source_folder)/'usd_benchmark.py'
+        workdir = Path(self.build_folder)/'benchmark'
+
+        tags = [f'--tag=package={dep.pref}']
+        for name in self._tracked_options:
+            value = dep.options.get_safe(name)
+            if value is not None:
+                tags.append(f'--tag={name}={value}')
+
+        self.run(f'python3 "{script}" "{workdir}" --size={size} --out="{out}" {" ".join(tags)}', env=['conanbuild', 'conanrun'])
+
+        # process startup (dlopen, first stage open, usdcat), written next to the other results
+        startup_script = Path(self.source_folder)/'startup_benchmark.py'
+        startup_out = Path(out).with_name(Path(out).stem + '_startup.json')
+        self.run(f'python3 "{startup_script}" "{workdir}" --size={size} --out="{startup_out}" {" ".join(tags)}', env=['conanbuild', 'conanrun'])
@@ -0,0 +1,187 @@
+#! /usr/bin/env python
+
+"""
+	Startup latency benchmark for a packaged OpenUSD, to measure the effect of link settings like the
+	recipe's `fast_startup` option. Every sample is a fresh process, so the dynamic loader does all of
+	its work each time. It measures:
+
+	- `dlopen.<lib>`: loading the core library (libusd_usd, or libusd_ms for monolithic builds) with
+	  its dependencies, from a process that has nothing else loaded
+	- `import_pxr`/`first_stage_open`: importing `pxr.Usd` and opening the first (tiny) stage, when
+	  the python bindings are available
+	- `tool.<name>`: running the packaged tool (`usdcat` by default) on a tiny stage, from spawn to exit
+
+	The tool is also run once with `LD_DEBUG=statistics` (glibc only) to record the loader's own
+	counters (relocations, loaded objects, time spent in the loader).
+
+	It needs the package's run environment (library path, PATH, PYTHONPATH), and writes a json file
+	with the same layout as `usd_benchmark.py`, so `abbench.py --benchmark=startup` can compare
+	variants:
+
+	```
+		./startup_benchmark.py /path/to/workdir [--size=small|medium|large] [--repeat=N] [--tool=usdcat]
+			[--out=results.json] [--tag=key=value ...]
+	```
+"""
+
+import sys, os, re, json, shutil, subprocess, time
+from pathlib import Path
+
+from usd_benchmark import summarize, host_metadata
+
+sizes = {
+	'small': 10,
+	'medium': 25,
+	'large': 100,
+}
+
+tiny_stage = '#usda 1.0\n(\n    defaultPrim = "World"\n)\n\ndef Xform "World"\n{\n    double weight = 1\n}\n'
+
+# runs in a fresh interpreter and prints the time it took to dlopen the library given as argument
+dlopen_script = '''
+import ctypes, sys, time
+start = time.perf_counter()
+ctypes.CDLL(sys.argv[1])
+print(time.perf_counter() - start)
+'''
+
+# prints the time to import pxr.Usd and the time to open the first stage
+stage_open_script = '''
+import sys, time
+start = time.perf_counter()
+from pxr import Usd
+imported = time.perf_counter()
+Usd.Stage.Open(sys.argv[1])
+print(imported - start, time.perf_counter() - imported)
+'''
+
+
+def find_core_library():
+	"""
+		Looks for the core OpenUSD library on the library path
+	"""
+	var = {'darwin': 'DYLD_LIBRARY_PATH', 'win32': 'PATH'}.get(sys.platform, 'LD_LIBRARY_PATH')
+	names = []
+	for stem in ['usd_ms', 'usd_usd']:
+		names += [f'lib{stem}.so', f'lib{stem}.dylib', f'{stem}.dll']
+	for folder in filter(None, os.environ.get(var, '').split(os.pathsep)):
+		for name in names:
+			if (Path(folder)/name).is_file():
+				return Path(folder)/name
+	return None
+
+
+def tool_command(tool, stage):
+	exe = shutil.which(tool)
+	if not exe:
+		return None
+	# the python tools are scripts, run them with this interpreter
+	with open(exe, 'rb') as f:
+		is_script = f.read(2) == b'#!'
+	return ([sys.executable, exe] if is_script else [exe]) + [str(stage)]
+
+
+def run_timed(cmd, repeat):
+	"""
+		Runs `cmd` `repeat` times and returns the samples it printed (one or more floats per run)
+	"""
+	samples = []
+	for _ in range(repeat):
+		out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+		samples.append([float(v) for v in out.split()])
+	return samples
+
+
+def loader_statistics(cmd):
+	"""
+		Runs `cmd` with glibc's `LD_DEBUG=statistics` and returns the counters it prints, or None
+		when the loader doesn't support it
+	"""
+	env = dict(os.environ, LD_DEBUG='statistics')
+	proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+	counters = {}
+	for line in proc.stderr.splitlines():
+		# e.g. "  12345:	  number of relocations:                    4567"
+		m = re.match(r'\s*\d+:\s+(.+?):\s+([\d,]+)(?:\s+cycles)?(?:\s+\([\d.]+%\))?\s*$', line)
+		if m:
+			counters[m.group(1).strip().replace(' ', '_')] = int(m.group(2).replace(',', ''))
+	return counters or None
+
+
+def run_benchmarks(workdir, repeat, tool):
+	workdir = Path(workdir)
+	workdir.mkdir(parents=True, exist_ok=True)
+	stage = workdir/'tiny.usda'
+	stage.write_text(tiny_stage)
+
+	results = {}
+	loader = None
+
+	if lib := find_core_library():
+		samples = run_timed([sys.executable, '-c', dlopen_script, str(lib)], repeat)
+		results[f'dlopen.{lib.name}'] = summarize([s[0] for s in samples])
+	else:
+		print('The core OpenUSD library was not found on the library path, skipping dlopen', file=sys.stderr)
+
+	try:
+		samples = run_timed([sys.executable, '-c', stage_open_script, str(stage)], repeat)
+		results['import_pxr'] = summarize([s[0] for s in samples])
+		results['first_stage_open'] = summarize([s[1] for s in samples])
+	except subprocess.CalledProcessError:
+		print('The pxr python bindings are not available, skipping first_stage_open', file=sys.stderr)
+
+	if cmd := tool_command(tool, stage):
+		samples = []
+		for _ in range(repeat):
+			start = time.perf_counter()
+			subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+			samples.append(time.perf_counter() - start)
+		results[f'tool.{tool}'] = summarize(samples)
+		if sys.platform.startswith('linux'):
+			loader = loader_statistics(cmd)
+	else:
+		print(f'{tool} not found, skipping it', file=sys.stderr)
+
+	return results, loader
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} </path/to/workdir> [--size=small|medium|large] [--repeat=N] [--tool=usdcat] [--out=results.json] [--tag=key=value ...]\n")
+
+
+if __name__ == '__main__':
+	if not len(sys.argv) >= 2:
+		print_usage()
+		sys.exit(1)
+
+	args = {}
+	tags = {}
+	for arg in sys.argv[2:]:
+		if arg.startswith('--tag='):
+			key, _, value = arg[len('--tag='):].partition('=')
+			tags[key] = value
+		elif arg.startswith('--') and '=' in arg:
+			key, value = arg[2:].split('=', 1)
+			args[key] = value
+
+	repeat = int(args.get('repeat', sizes[args.get('size', 'small')]))
+	tool = args.get('tool', 'usdcat')
+	results, loader = run_benchmarks(sys.argv[1], repeat, tool)
+	report = {
+		'host': host_metadata(),
+		'tags': tags,
+		'parameters': {'repeat': repeat, 'tool': tool},
+		'results': results,
+		'loader_statistics': loader,
+	}
+
+	for name, r in results.items():
+		print(f"{name:32} median {r['median'] * 1000:10.2f}ms  stdev {r['stdev'] * 1000:8.2f}ms")
+	for name, value in (loader or {}).items():
+		print(f'{name:48} {value}')
+
+	if out := args.get('out'):
+		Path(out).parent.mkdir(parents=True, exist_ok=True)
+		with open(out, 'w') as f:
+			json.dump(report, f, indent=2)
+		print(f'Results written to {out}')
@@ -0,0 +1,59 @@
+// Minimal C++ consumer of the package, built against the most complete of usdGeom, usd or sdf that
+// the package has. Defining a schema prim needs the usdGeom plugin to be registered, so with usdGeom
+// this also checks that plug finds the packaged plugInfo.json files
+
+#include <pxr/pxr.h>
+
+#if defined(TEST_PACKAGE_usdGeom)
+#include <pxr/usd/usd/stage.h>
+#include <pxr/usd/usdGeom/sphere.h>
+#include <pxr/usd/usdGeom/xform.h>
+#elif defined(TEST_PACKAGE_usd)
+#include <pxr/usd/usd/stage.h>
+#else
+#include <pxr/usd/sdf/layer.h>
+#include <pxr/usd/sdf/primSpec.h>
+#endif
+
+#include <iostream>
+#include <string>
+
+PXR_NAMESPACE_USING_DIRECTIVE
+
+int main()
+{
+#if defined(TEST_PACKAGE_usdGeom)
+    UsdStageRefPtr stage = UsdStage::CreateInMemory();
+    UsdGeomXform::Define(stage, SdfPath("/root"));
+    UsdGeomSphere sphere = UsdGeomSphere::Define(stage, SdfPath("/root/sphere"));
+    if (!sphere) {
+        std::cerr << "UsdGeomSphere is not registered, the usdGeom plugin wasn't found" << std::endl;
+        return 1;
+    }
+    sphere.GetRadiusAttr().Set(2.0);
+
+    std::string text;
+    stage->ExportToString(&text);
+    std::cout << text;
+
+    double radius = 0.0;
+    sphere.GetRadiusAttr().Get(&radius);
+    return radius == 2.0 ? 0 : 1;
+#elif defined(TEST_PACKAGE_usd)
+    UsdStageRefPtr stage = UsdStage::CreateInMemory();
+    UsdPrim prim = stage->DefinePrim(SdfPath("/root"));
+
+    std::string text;
+    stage->ExportToString(&text);
+    std::cout << text;
+    return prim.IsValid() ? 0 : 1;
+#else
+    SdfLayerRefPtr layer = SdfLayer::CreateAnonymous(".usda");
+    SdfPrimSpecHandle prim = SdfPrimSpec::New(layer, "root", SdfSpecifierDef);
+
+    std::string text;
+    layer->ExportToString(&text);
+    std::cout << text;
+    return prim ? 0 : 1;
+#endif
+}
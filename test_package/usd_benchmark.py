@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+
+"""
+	Performance benchmark for a packaged OpenUSD. It generates synthetic stages (with
+	`make_stages` from the recipe's `pgo_training.py`), times the common operations on them and
+	writes the results, along with metadata about the host and the package, to a json file so they
+	can be compared across package revisions and option combinations.
+
+	It's run by the test_package, but can also be used on its own with the package's environment
+	(PYTHONPATH with the `pxr` bindings and the recipe folder for `pgo_training.py`, and the library
+	paths):
+
+	```
+		./usd_benchmark.py /path/to/workdir [--size=small|medium|large] [--prims=N] [--layers=N]
+			[--variants=N] [--refs=N] [--repeat=N] [--out=results.json] [--tag=key=value ...]
+	```
+
+	Every metric is measured `repeat` times, and the raw samples are stored along with their
+	min/median/mean/stdev (in seconds).
+"""
+
+import sys, os, json, time, platform, statistics, socket, tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+sizes = {
+	'small': dict(prims=200, layers=2, variants=2, refs=1, repeat=3),
+	'medium': dict(prims=2000, layers=4, variants=4, refs=2, repeat=5),
+	'large': dict(prims=20000, layers=8, variants=8, refs=4, repeat=5),
+}
+
+
+def measure(fn, repeat):
+	samples = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		samples.append(time.perf_counter() - start)
+	return summarize(samples)
+
+
+def summarize(samples):
+	return {
+		'min': min(samples),
+		'median': statistics.median(samples),
+		'mean': statistics.mean(samples),
+		'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+		'samples': samples,
+	}
+
+
+def host_metadata():
+	meta = {
+		'hostname': socket.gethostname(),
+		'platform': platform.platform(),
+		'machine': platform.machine(),
+		'python': platform.python_version(),
+		'cpu_count': os.cpu_count(),
+		'timestamp': datetime.now(timezone.utc).isoformat(),
+	}
+	try:
+		from pxr import Usd
+		meta['usd_version'] = '.'.join(str(v) for v in Usd.GetVersion())
+	except ImportError:
+		# python=False builds
+		pass
+	try:
+		with open('/proc/cpuinfo') as f:
+			for line in f:
+				if line.startswith('model name'):
+					meta['cpu'] = line.split(':', 1)[1].strip()
+					break
+		with open('/proc/meminfo') as f:
+			meta['memory_kb'] = int(f.readline().split()[1])
+	except OSError:
+		pass
+	return meta
+
+
+def run_benchmarks(workdir, prims, layers, variants, refs, repeat):
+	from pxr import Usd, Sdf, UsdUtils
+	# imported here, so `startup_benchmark.py` can use the helpers above without the generator
+	from pgo_training import make_stages, traverse
+
+	workdir = Path(workdir)
+	stages = make_stages(workdir, prims=prims, layers=layers, variants=variants, refs=refs)
+	results = {}
+
+	for ext, path in stages.items():
+		def stage_open():
+			Usd.Stage.Open(str(path), load=Usd.Stage.LoadAll)
+		results[f'stage_open.{ext}'] = measure(stage_open, repeat)
+
+		stage = Usd.Stage.Open(str(path))
+		results[f'traversal.{ext}'] = measure(lambda: sum(1 for _ in Usd.PrimRange(stage.GetPseudoRoot())), repeat)
+		results[f'value_resolution.{ext}'] = measure(lambda: traverse(stage, range(0, 24, 4)), repeat)
+
+		results[f'layer_parse.{ext}'] = measure(lambda: Sdf.Layer.OpenAsAnonymous(str(path)), repeat)
+		layer = Sdf.Layer.FindOrOpen(str(path))
+		with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+			results[f'layer_write.{ext}'] = measure(lambda: layer.Export(str(Path(tmp)/f'out.{ext}')), repeat)
+
+		results[f'flatten_layer_stack.{ext}'] = measure(lambda: UsdUtils.FlattenLayerStack(stage), repeat)
+		results[f'flatten_stage.{ext}'] = measure(lambda: stage.Flatten(), repeat)
+		del stage
+
+	return results
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} </path/to/workdir> [--size=small|medium|large] [--prims=N] [--layers=N] [--variants=N] [--refs=N] [--repeat=N] [--out=results.json] [--tag=key=value ...]\n")
+
+
+if __name__ == '__main__':
+	if not len(sys.argv) >= 2:
+		print_usage()
+		sys.exit(1)
+
+	args = {}
+	tags = {}
+	for arg in sys.argv[2:]:
+		if arg.startswith('--tag='):
+			key, _, value = arg[len('--tag='):].partition('=')
+			tags[key] = value
+		elif arg.startswith('--') and '=' in arg:
+			key, value = arg[2:].split('=', 1)
+			args[key] = value
+
+	params = dict(sizes[args.get('size', 'small')])
+	for key in ['prims', 'layers', 'variants', 'refs', 'repeat']:
+		if key in args:
+			params[key] = int(args[key])
+
+	results = run_benchmarks(sys.argv[1], **params)
+	report = {
+		'host': host_metadata(),
+		'tags': tags,
+		'parameters': params,
+		'results': results,
+	}
+
+	for name, r in results.items():
+		print(f"{name:32} median {r['median'] * 1000:10.2f}ms  stdev {r['stdev'] * 1000:8.2f}ms")
+
+	if out := args.get('out'):
+		Path(out).parent.mkdir(parents=True, exist_ok=True)
+		with open(out, 'w') as f:
+			json.dump(report, f, indent=2)
+		print(f'Results written to {out}')
@@ -0,0 +1,228 @@
+#! /usr/bin/env python
+
+"""
+	Finds the OpenUSD sources that can't be compiled in the same unity batch as the other sources of
+	their library. A unity build concatenates the sources of a target, so two sources collide when
+	both define the same file-local name:
+
+	- the token struct of `TF_DEFINE_PRIVATE_TOKENS` and the variable of `TF_MAKE_STATIC_DATA`
+	- the static function of `TF_REGISTRY_FUNCTION` for the same key type (and tag), or two registry
+	  functions on the same line, whose constructor is named after `__LINE__`
+	- file-static functions and variables, `const`/`constexpr` variables and everything declared at
+	  the top of an anonymous namespace
+	- a macro that a source `#define`s without `#undef`ing it, and that another source uses
+
+	Sources are grouped by folder, which holds a library and its python module. In every group the
+	first source defining a name keeps it, and the others are reported, so that all the remaining
+	sources can still be batched together. It's run by the recipe's `generate()` with
+	`unity_build=True`, but can also be used on its own:
+
+	```
+		./unitycheck.py /path/to/openusd/source [--verbose]
+	```
+"""
+
+import sys, os, re
+from collections import defaultdict
+from pathlib import Path
+
+comment_or_literal_re = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'', re.S)
+directive_re = re.compile(r'^[ \t]*#(?:[^\n]*\\\n)*[^\n]*', re.M)
+define_re = re.compile(r'#\s*define\s+(\w+)')
+undef_re = re.compile(r'#\s*undef\s+(\w+)')
+identifier_re = re.compile(r'\b[A-Za-z_]\w*\b')
+
+private_tokens_re = re.compile(r'\bTF_DEFINE_PRIVATE_TOKENS\s*\(\s*(\w+)')
+static_data_re = re.compile(r'\bTF_MAKE_STATIC_DATA\s*\(\s*(?:\([^()]*\)|[^,]+),\s*(\w+)')
+registry_re = re.compile(r'\bTF_REGISTRY_FUNCTION(?:_WITH_TAG)?\s*\(\s*([\w:]+)\s*(?:,\s*(\w+)\s*)?\)')
+
+# leading macro invocations of a declaration, e.g. `PXR_NAMESPACE_OPEN_SCOPE` or `ARCH_HIDDEN`
+leading_macro_re = re.compile(r'^[A-Z][A-Z0-9_]*\b\s*')
+tag_re = re.compile(r'^(?:struct|class|union|enum(?:\s+class|\s+struct)?)\s+(?:[A-Z][A-Z0-9_]*\s+)?(\w+)')
+alias_re = re.compile(r'^using\s+(\w+)\s*=')
+
+
+def strip_code(text):
+	"""
+		Returns the source without comments, literals and preprocessor directives, and the macros it
+		leaves defined at its end
+	"""
+	# keep the line breaks, registry functions are told apart by their line
+	blank = lambda m: '\n' * m.group(0).count('\n') or ' '
+	text = comment_or_literal_re.sub(lambda m: blank(m) if m.group(0)[0] == '/' else '""', text)
+	macros = set()
+	for directive in directive_re.findall(text):
+		if m := define_re.match(directive.strip()):
+			macros.add(m.group(1))
+		elif m := undef_re.match(directive.strip()):
+			macros.discard(m.group(1))
+	return directive_re.sub(blank, text), macros
+
+
+def skip_balanced(text, start, open_char, close_char):
+	"""
+		Returns the index after the bracket that closes the one at `start`
+	"""
+	depth = 0
+	for i in range(start, len(text)):
+		if text[i] == open_char:
+			depth += 1
+		elif text[i] == close_char:
+			depth -= 1
+			if depth == 0:
+				return i + 1
+	return len(text)
+
+
+def declared_name(statement):
+	"""
+		Returns (name, is_function) for the name a namespace-scope declaration defines, or None
+	"""
+	statement = statement.strip()
+	while True:
+		if statement.startswith('template'):
+			start = statement.find('<')
+			if start < 0:
+				return None
+			statement = statement[skip_balanced(statement, start, '<', '>'):].lstrip()
+		elif m := leading_macro_re.match(statement):
+			rest = statement[m.end():]
+			if rest.startswith('('):
+				rest = rest[skip_balanced(rest, 0, '(', ')'):]
+			if not rest.strip():
+				return None
+			statement = rest.lstrip()
+		else:
+			break
+
+	if m := tag_re.match(statement):
+		return m.group(1), False
+	if m := alias_re.match(statement):
+		return m.group(1), False
+	if statement.startswith('typedef'):
+		names = identifier_re.findall(statement)
+		return (names[-1], False) if names else None
+
+	head = re.split(r'[=\[{]', statement, 1)[0]
+	is_function = '(' in head
+	if is_function:
+		head = head.split('(', 1)[0]
+	head = head.rstrip()
+	m = re.search(r'(::\s*)?~?\b(\w+)$', head)
+	if not m or m.group(1) or re.search(r'\boperator\b', head):
+		# member definitions and operators don't define new names
+		return None
+	return m.group(2), is_function
+
+
+def local_names(code):
+	"""
+		Returns the file-local names that the (stripped) source defines at namespace scope
+	"""
+	names = set()
+	# the kind of every open brace: 'anon' or 'ns' for namespaces, 'body' for anything else
+	scopes = []
+	statement_start = 0
+	for m in re.finditer(r'[{};]', code):
+		char = m.group(0)
+		statement = code[statement_start:m.start()]
+		at_namespace_scope = all(scope != 'body' for scope in scopes)
+		if char == '}':
+			if scopes:
+				scopes.pop()
+		elif at_namespace_scope:
+			if char == '{' and re.search(r'\bnamespace\s*$', statement):
+				scopes.append('anon')
+			elif char == '{' and re.search(r'\bnamespace\s+[\w:]+\s*$|\bextern\s*""\s*$', statement):
+				scopes.append('ns')
+			else:
+				if char == '{':
+					scopes.append('body')
+				declared = declared_name(statement)
+				if declared:
+					name, is_function = declared
+					words = set(identifier_re.findall(statement.split('(', 1)[0] if is_function else statement))
+					if ('anon' in scopes[:-1] if char == '{' else 'anon' in scopes) or 'static' in words \
+						or (not is_function and words & {'const', 'constexpr'} and 'extern' not in words):
+						names.add(name)
+		else:
+			if char == '{':
+				scopes.append('body')
+		statement_start = m.end()
+	return names
+
+
+def scan_source(path):
+	"""
+		Returns (names, macros, identifiers) of a source: the file-local names it defines, the macros
+		it leaves defined, and every identifier it uses
+	"""
+	with open(path, errors='replace') as f:
+		text = f.read()
+	code, macros = strip_code(text)
+	names = {f'tokens {name}' for name in private_tokens_re.findall(code)}
+	names |= {f'static data {name}' for name in static_data_re.findall(code)}
+	for m in registry_re.finditer(code):
+		names.add(f'registry function {m.group(1)} {m.group(2) or ""}'.rstrip())
+		names.add(f'registry constructor at line {code.count(chr(10), 0, m.start()) + 1}')
+	names |= local_names(code)
+	return names, macros, set(identifier_re.findall(code))
+
+
+def find_collisions(files):
+	"""
+		Returns {source: [colliding names]} for the sources of one target (in a stable order) that
+		have to be compiled on their own
+	"""
+	claimed = {}
+	macros = {}
+	identifiers = set()
+	collisions = {}
+	for path in files:
+		names, file_macros, file_identifiers = scan_source(path)
+		found = [f'{name} (also in {claimed[name].name})' for name in sorted(names) if name in claimed]
+		found += [f'macro {name} (defined in {macros[name].name})' for name in sorted(file_identifiers) if name in macros]
+		found += [f'macro {name}' for name in sorted(file_macros & identifiers)]
+		if found:
+			collisions[path] = found
+			continue
+		for name in names:
+			claimed[name] = path
+		for name in file_macros:
+			macros[name] = path
+		identifiers |= file_identifiers
+	return collisions
+
+
+def scan_tree(source_dir):
+	"""
+		Returns ({source: [colliding names]}, number of scanned sources) for every folder of OpenUSD
+		sources under `source_dir`
+	"""
+	groups = defaultdict(list)
+	for root, dirs, files in os.walk(Path(source_dir)/'pxr'):
+		dirs.sort()
+		groups[root] += [Path(root)/name for name in sorted(files) if name.endswith('.cpp')]
+	collisions = {}
+	for files in groups.values():
+		collisions.update(find_collisions(files))
+	return collisions, sum(len(files) for files in groups.values())
+
+
+def print_usage():
+	print(f"USAGE:\n\t{sys.argv[0]} /path/to/openusd/source [--verbose]\n")
+	print("Lists the sources that would collide with others in a unity build.")
+
+
+if __name__ == '__main__':
+	if not len(sys.argv) >= 2:
+		print_usage()
+		sys.exit(1)
+
+	collisions, total = scan_tree(sys.argv[1])
+	for path, names in collisions.items():
+		print(os.path.relpath(path, sys.argv[1]))
+		if '--verbose' in sys.argv[2:]:
+			for name in names:
+				print(f'\t{name}')
+	print(f'{len(collisions)} of {total} sources have to be compiled on their own', file=sys.stderr)